@@ -0,0 +1,228 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+bench_client.py
+
+Benchmarks of the client hot paths against the local mock server.
+
+    $ python3 benchmarks/bench_client.py --requests 2000 --concurrency 16 --output results.json
+    $ python3 benchmarks/bench_client.py --scenario get_channel --scenario decode_channels
+
+Each scenario runs in several modes:
+
+    sync     one Clubhouse, calls one after another
+    threads  one Clubhouse shared by `concurrency` threads
+    async    one AsyncClubhouse, `concurrency` calls in flight (requires aiohttp)
+    pool     ClubhousePool of `accounts` accounts, `concurrency` calls in flight
+
+and reports operations per second and p50/p90/p99 latency in milliseconds.
+Results are printed as a table and written as JSON, so that two runs can
+be compared to catch regressions.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from clubhouse.clubhouse import Clubhouse
+from clubhouse.pool import ClubhousePool
+from clubhouse.codec import JSONCodec, OrjsonCodec, orjson
+from clubhouse.mock_server import MockServer, MockData
+
+try:
+    from clubhouse.async_clubhouse import AsyncClubhouse, aiohttp
+except ImportError:
+    aiohttp = None
+
+ACCOUNT = {"user_id": "1", "user_token": "benchmark", "user_device": "benchmark"}
+
+def percentile(samples, percent):
+    """ (list of float, float) -> float
+
+    Nearest-rank percentile of sorted samples.
+    """
+    if not samples:
+        return None
+    index = max(0, int(round(percent / 100 * len(samples))) - 1)
+    return samples[min(index, len(samples) - 1)]
+
+def summarize(samples, elapsed, unit="requests"):
+    """ (list of float, float, str) -> dict """
+    samples = sorted(samples)
+    return {
+        "operations": len(samples),
+        "unit": unit,
+        "elapsed": round(elapsed, 4),
+        "per_second": round(len(samples) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p90_ms": round(percentile(samples, 90) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def run_sync(call, args_list, concurrency):
+    """ Run call(*args) for each args, on `concurrency` threads (1 = in sequence). """
+    start = time.perf_counter()
+    if concurrency <= 1:
+        samples = [_timed(call, *args) for args in args_list]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(lambda args: _timed(call, *args), args_list))
+    return samples, time.perf_counter() - start
+
+def run_async(make_call, args_list, concurrency, url, pool_maxsize):
+    """ Run the coroutine make_call(client)(*args) for each args, `concurrency` at a time. """
+    async def main():
+        async with AsyncClubhouse(**ACCOUNT, api_url=url, pool_maxsize=pool_maxsize) as client:
+            call = make_call(client)
+            slots = asyncio.Semaphore(concurrency)
+            async def timed(args):
+                async with slots:
+                    start = time.perf_counter()
+                    await call(*args)
+                    return time.perf_counter() - start
+            start = time.perf_counter()
+            samples = await asyncio.gather(*(timed(args) for args in args_list))
+            return list(samples), time.perf_counter() - start
+    return asyncio.run(main())
+
+def bench_endpoint(name, method, args_list, options):
+    """ Benchmark one endpoint method in every mode. """
+    url = options.url
+    results = {}
+    with Clubhouse(**ACCOUNT, api_url=url, pool_maxsize=options.concurrency) as client:
+        call = getattr(client, method)
+        call(*args_list[0])
+        results["sync"] = summarize(*run_sync(call, args_list, 1))
+        results["threads"] = summarize(*run_sync(call, args_list, options.concurrency))
+    if aiohttp is not None:
+        results["async"] = summarize(*run_async(lambda client: getattr(client, method), args_list, options.concurrency, url, options.concurrency))
+    accounts = [dict(ACCOUNT, user_id=str(i + 1)) for i in range(options.accounts)]
+    with ClubhousePool(accounts, rate=0, max_workers=options.concurrency, api_url=url) as pool:
+        results["pool"] = summarize(*run_sync(lambda *args: pool.call(method, *args), args_list, options.concurrency))
+    return results
+
+def bench_get_channel(options):
+    channels = [f"mock{i % options.channels:06d}" for i in range(options.requests)]
+    return bench_endpoint("get_channel", "get_channel", [(x,) for x in channels], options)
+
+def bench_active_ping(options):
+    channels = [f"mock{i % options.channels:06d}" for i in range(options.requests)]
+    return bench_endpoint("active_ping", "active_ping", [(x,) for x in channels], options)
+
+def bench_search_users(options):
+    queries = [f"user{i}" for i in range(options.requests)]
+    return bench_endpoint("search_users", "search_users", [(x,) for x in queries], options)
+
+def bench_paging(options):
+    """ Iterate over every follower of several users, in sequence and with parallel pages. """
+    user_ids = list(range(1, options.paging_users + 1))
+    results = {}
+    with Clubhouse(**ACCOUNT, api_url=options.url, pool_maxsize=options.concurrency) as client:
+        for mode, kwargs in (("sync", {}), ("prefetch", {"prefetch": True}), ("concurrent", {"concurrency": options.concurrency})):
+            iterate = lambda user_id: sum(1 for _ in client.iter_followers(user_id, page_size=50, **kwargs))
+            results[mode] = summarize(*run_sync(iterate, [(x,) for x in user_ids], 1), unit="users")
+    if aiohttp is not None:
+        async def iterate_async(client, user_id):
+            return sum([1 async for _ in client.iter_followers(user_id, page_size=50, concurrency=options.concurrency)])
+        results["async"] = summarize(
+            *run_async(lambda client: lambda user_id: iterate_async(client, user_id), [(x,) for x in user_ids], 1, options.url, options.concurrency),
+            unit="users"
+        )
+    return results
+
+def bench_decode_channels(options):
+    """ Decode a large get_channels response, without any network. """
+    data = MockData(num_channels=options.decode_channels, channel_size=options.channel_size)
+    payload = json.dumps(data.channels()).encode("utf-8")
+    results = {"payload_bytes": len(payload)}
+    codecs = [JSONCodec()] + ([OrjsonCodec()] if orjson is not None else [])
+    for codec in codecs:
+        samples = [_timed(codec.decode, payload) for _ in range(options.decode_rounds)]
+        results[codec.name] = summarize(samples, sum(samples), unit="decodes")
+    return results
+
+SCENARIOS = {
+    "get_channel": bench_get_channel,
+    "active_ping": bench_active_ping,
+    "get_followers": bench_paging,
+    "search_users": bench_search_users,
+    "decode_channels": bench_decode_channels,
+}
+
+def print_table(results):
+    """ Print the results as a table on stderr. """
+    out = sys.stderr
+    out.write(f"{'scenario':<16} {'mode':<11} {'ops/s':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}\n")
+    for scenario, modes in results["scenarios"].items():
+        for mode, result in modes.items():
+            if not isinstance(result, dict):
+                continue
+            out.write(
+                f"{scenario:<16} {mode:<11} {result['per_second']:>10} {result['p50_ms']:>9} "
+                f"{result['p90_ms']:>9} {result['p99_ms']:>9}\n"
+            )
+
+def main():
+    """ () -> NoneType """
+    parser = argparse.ArgumentParser(description="Benchmark the client against the local mock server")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="scenario to run, every one by default")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="calls in flight for threads, async and pool modes")
+    parser.add_argument("--accounts", type=int, default=4, help="accounts of the pool mode")
+    parser.add_argument("--latency", type=float, default=0.005, help="latency of the mock server, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random latency added by the mock server, in seconds")
+    parser.add_argument("--channels", type=int, default=50, help="channels of the mock server")
+    parser.add_argument("--channel-size", type=int, default=500, help="users in the largest channel")
+    parser.add_argument("--follows", type=int, default=500, help="average follows per user")
+    parser.add_argument("--paging-users", type=int, default=20, help="users whose followers are iterated")
+    parser.add_argument("--decode-channels", type=int, default=500, help="channels of the decoded get_channels response")
+    parser.add_argument("--decode-rounds", type=int, default=50, help="decodes per codec")
+    parser.add_argument("--url", help="API URL of an already running mock server")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    options = parser.parse_args()
+
+    server = None
+    if not options.url:
+        data = MockData(num_follows=options.follows, num_channels=options.channels, channel_size=options.channel_size)
+        server = MockServer(data=data, latency=options.latency, jitter=options.jitter).start()
+        options.url = server.url
+
+    results = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "codec": "orjson" if orjson is not None else "json",
+        "aiohttp": aiohttp is not None,
+        "options": {k: v for k, v in vars(options).items() if k not in ("output", "scenario")},
+        "scenarios": {},
+    }
+    try:
+        for name in options.scenario or SCENARIOS:
+            results["scenarios"][name] = SCENARIOS[name](options)
+    finally:
+        if server is not None:
+            server.stop()
+
+    print_table(results)
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    main()
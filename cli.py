@@ -8,13 +8,16 @@ RTC: For voice communication
 
 import os
 import sys
-import threading
+import traceback
 import configparser
+from concurrent.futures import ThreadPoolExecutor
 import keyboard
 from termcolor import colored
 from rich.table import Table
 from rich.console import Console
 from clubhouse.clubhouse import Clubhouse
+from clubhouse.cache import TTLCache
+from clubhouse.scheduler import default_scheduler
 
 # Set some global variables
 try:
@@ -33,23 +36,32 @@ try:
 except ImportError:
     RTC = None
 
+# Runs the set_interval jobs, so that their API calls do not hold up the shared scheduler thread.
+INTERVAL_WORKER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cli-interval")
+
 def set_interval(interval):
     """ (int) -> decorator
 
     set_interval decorator
+    Timed by the shared scheduler, run on INTERVAL_WORKER, and stops once the
+    function returns a false value. A run is skipped while the previous one is not done.
+    Returns a handle whose set() stops the job.
     """
     def decorator(func):
         def wrap(*args, **kwargs):
-            stopped = threading.Event()
-            def loop():
-                while not stopped.wait(interval):
-                    ret = func(*args, **kwargs)
-                    if not ret:
-                        break
-            thread = threading.Thread(target=loop)
-            thread.daemon = True
-            thread.start()
-            return stopped
+            running = []
+            def run():
+                try:
+                    if not func(*args, **kwargs):
+                        job.set()
+                except Exception:
+                    traceback.print_exc()
+                    job.set()
+            def submit():
+                if not running or running[0].done():
+                    running[:] = [INTERVAL_WORKER.submit(run)]
+            job = default_scheduler().every(interval, submit)
+            return job
         return wrap
     return decorator
 
@@ -172,7 +184,6 @@ def chat_main(client):
     max_limit = 8000
     channel_speaker_permission = False
     _wait_func = None
-    _ping_func = None
 
     def _request_speaker_permission(client, channel_name, user_id):
         """ (str) -> bool
@@ -184,15 +195,6 @@ def chat_main(client):
             _wait_func = _wait_speaker_permission(client, channel_name, user_id)
             print("[/] You've raised your hand. Wait for the moderator to give you the permission.")
 
-    @set_interval(30)
-    def _ping_keep_alive(client, channel_name):
-        """ (str) -> bool
-
-        Continue to ping alive every 30 seconds.
-        """
-        client.active_ping(channel_name)
-        return True
-
     @set_interval(10)
     def _wait_speaker_permission(client, channel_name, user_id):
         """ (str) -> bool
@@ -270,9 +272,8 @@ def chat_main(client):
             print("[!] Agora SDK is not installed.")
             print("    You may not speak or listen to the conversation.")
 
-        # Activate pinging
+        # Activate pinging. The client keeps pinging joined channels.
         client.active_ping(channel_name)
-        _ping_func = _ping_keep_alive(client, channel_name)
         _wait_func = None
 
         # Add raise_hands key bindings for speaker permission
@@ -295,8 +296,6 @@ def chat_main(client):
         keyboard.unhook_all()
 
         # Safely leave the channel upon quitting the channel.
-        if _ping_func:
-            _ping_func.set()
         if _wait_func:
             _wait_func.set()
         if RTC:
@@ -973,7 +972,9 @@ def main():
         client = Clubhouse(
             user_id=user_id,
             user_token=user_token,
-            user_device=user_device
+            user_device=user_device,
+            cache=TTLCache(),
+            keep_alive=True
         )
 
         # Check if user is still on the waitlist
@@ -0,0 +1,229 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+# pylint: disable=line-too-long
+
+"""
+async_clubhouse.py
+
+asyncio counterpart of clubhouse.py.
+Requires aiohttp. (pip3 install clubhouse-py[async])
+"""
+
+import time
+import asyncio
+import inspect
+import functools
+from .clubhouse import Clubhouse
+from .paging import aiter_pages
+from .singleflight import AsyncSingleFlight
+from .deadline import remaining as deadline_remaining, DeadlineExceeded
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Members of Clubhouse that are not API endpoints.
+_NON_ENDPOINTS = ("add_hook", "close", "deadline", "remove_hook", "require_authentication", "unstable_endpoint")
+
+def _coroutine_endpoint(func):
+    """ Turn an endpoint method of Clubhouse into a coroutine function. """
+    @functools.wraps(func)
+    async def wrap(self, *args, **kwargs):
+        ret = func(self, *args, **kwargs)
+        if inspect.isawaitable(ret):
+            ret = await ret
+        return ret
+    return wrap
+
+class AsyncClubhouse(Clubhouse):
+    """
+    AsyncClubhouse Class
+
+    Exposes the same endpoints as Clubhouse, as coroutines.
+    Every call of a single client shares one aiohttp connection pool.
+
+    The iter_* methods return async generators.
+
+    >>> async with AsyncClubhouse(user_id, user_token, user_device) as clubhouse:
+    ...     channels = await clubhouse.get_channels()
+    ...     async for user in clubhouse.iter_followers(user_id):
+    ...         print(user)
+    """
+
+    _iter_pages = staticmethod(aiter_pages)
+    _single_flight_class = AsyncSingleFlight
+
+    def __init__(self, *args, **kwargs):
+        """ (AsyncClubhouse, ...) -> NoneType
+        Set authenticated information. Takes the same arguments as Clubhouse.
+
+        At most `pool_connections * pool_maxsize` connections are open at once,
+        and at most `pool_maxsize` of them to a single host.
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncClubhouse requires aiohttp. (pip3 install aiohttp)")
+        super().__init__(*args, **kwargs)
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' for AsyncClubhouse")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _create_session(self, pool_connections, pool_maxsize):
+        """ (AsyncClubhouse, int, int) -> NoneType
+
+        aiohttp sessions must be created inside the running event loop,
+        so only remember the pool size here. See _get_session().
+        """
+        self._pool_limit = pool_connections * pool_maxsize
+        self._pool_limit_per_host = pool_maxsize
+        return None
+
+    def _get_session(self):
+        """ (AsyncClubhouse) -> aiohttp.ClientSession
+
+        Get the shared session, creating it on the first call.
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_limit,
+                limit_per_host=self._pool_limit_per_host
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def _request(self, method, endpoint, query=None, data=None, files=None):
+        """ (AsyncClubhouse, str, str, str, dict, dict) -> dict
+
+        Send a request to the given endpoint, through the cache if the client has one.
+        Identical reads in flight share one request if the client coalesces them.
+        """
+        ttl, key, result = self._lookup(endpoint, query, data)
+        if result is not None:
+            return result
+        if self._coalesces(endpoint):
+            result = await self._flights.do((endpoint, key), self._send, method, endpoint, query, data, files)
+        else:
+            result = await self._send(method, endpoint, query, data, files)
+        return self._received(endpoint, ttl, key, query, data, result)
+
+    async def _send(self, method, endpoint, query=None, data=None, files=None):
+        """ (AsyncClubhouse, str, str, str, dict, dict) -> dict
+
+        Send a request to the given endpoint over the pooled session.
+        """
+        if self.metrics is not None or self._hooks is not None:
+            return await self._send_observed(method, endpoint, query, data, files)
+        req, content, _ = await self._transmit(method, endpoint, query, data, files)
+        return self._decode_content(req, content)
+
+    async def _send_observed(self, method, endpoint, query=None, data=None, files=None):
+        """ (AsyncClubhouse, str, str, str, dict, dict) -> dict
+
+        Send a request like _send(), through the hooks and the metrics of the client.
+        """
+        context, start = self._before_send(method, endpoint, query, data)
+        attempts = [0]
+        status = sent = received = 0
+        try:
+            req, content, sent = await self._transmit(method, endpoint, query, data, files, attempts)
+            status = req.status
+            received = len(content)
+            result = self._decode_content(req, content)
+        except BaseException as ex:
+            self._after_send(context, start, attempts[0], status or type(ex).__name__, sent, received, error=ex)
+            raise
+        return self._after_send(context, start, attempts[0], status, sent, received, result)
+
+    async def _transmit(self, method, endpoint, query=None, data=None, files=None, attempts=None):
+        """ (AsyncClubhouse, str, str, str, dict, dict, list) -> (aiohttp.ClientResponse, bytes, int)
+
+        Send a request until it succeeds or should not be retried anymore.
+        Returns the last response, its body and the bytes of request bodies sent.
+        `attempts[0]`, if given, is kept at the number of attempts made so far.
+        """
+        session = self._get_session()
+        encoded = None if files or data is None else self.codec.encode(data)
+        url = self._urls.get(endpoint) or f"{self.API_URL}/{endpoint}"
+        if files:
+            # aiohttp closes the files it sends, so read them once and send their contents on every attempt.
+            uploads = []
+            for name, (filename, fileobj, content_type) in files.items():
+                try:
+                    uploads.append((name, filename, fileobj.read(), content_type))
+                finally:
+                    fileobj.close()
+        attempt = 0
+        while True:
+            attempt += 1
+            if attempts is not None:
+                attempts[0] = attempt
+            delay = self._rate_limit_delay(endpoint)
+            if delay:
+                await asyncio.sleep(delay)
+            connect, read = self._timeout(endpoint) or (None, None)
+            left = deadline_remaining()
+            timeout = aiohttp.ClientTimeout(total=left, sock_connect=connect, sock_read=read)
+            headers = self.HEADERS
+            body = {"data": encoded}
+            if files:
+                headers = self._upload_headers
+                form = aiohttp.FormData()
+                for name, filename, content, content_type in uploads:
+                    form.add_field(name, content, filename=filename, content_type=content_type)
+                body = {"data": form}
+            try:
+                async with session.request(method, url, headers=headers, params=query, timeout=timeout, **body) as req:
+                    delay = self._retry_delay(endpoint, attempt, req.status, req.headers.get("Retry-After"))
+                    if delay is None:
+                        return req, await req.read(), len(encoded or b"") * attempt
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as ex:
+                left = deadline_remaining()
+                if left is not None and left <= 0:
+                    raise DeadlineExceeded(f"Deadline exceeded while calling {endpoint}") from ex
+                delay = self._retry_delay(endpoint, attempt, sent=self._sent(ex))
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    def _sent(self, error):
+        """ (AsyncClubhouse, Exception) -> bool
+
+        Same rule as Clubhouse._sent, for aiohttp errors.
+        """
+        # ConnectionTimeoutError is new in aiohttp 3.10.
+        return not isinstance(error, (aiohttp.ClientConnectorError, getattr(aiohttp, "ConnectionTimeoutError", aiohttp.ClientConnectorError)))
+
+    def _decode_content(self, req, content):
+        """ (AsyncClubhouse, aiohttp.ClientResponse, bytes) -> dict
+
+        Decode a response of the API.
+        """
+        try:
+            return self.codec.decode(content)
+        except ValueError:
+            # Not an API error message. Raise the HTTP error if there is one.
+            req.raise_for_status()
+            raise
+
+    async def close(self):
+        """ (AsyncClubhouse) -> NoneType
+
+        Close every pooled connection. The client should not be used afterwards.
+        """
+        if self.keep_alive is not None:
+            self.keep_alive.stop()
+        if self.session is not None:
+            await self.session.close()
+
+for _name, _func in inspect.getmembers(Clubhouse, inspect.isfunction):
+    if _name.startswith(("_", "iter_")) or _name in _NON_ENDPOINTS:
+        continue
+    _impl = AsyncClubhouse.__dict__.get(_name, _func)
+    if not (inspect.iscoroutinefunction(_impl) or inspect.isasyncgenfunction(_impl)):
+        setattr(AsyncClubhouse, _name, _coroutine_endpoint(_impl))
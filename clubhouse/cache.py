@@ -0,0 +1,273 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+cache.py
+
+Response caches for read-mostly endpoints (get_profile, get_club, get_topic, ...).
+TTLCache keeps responses in memory, SQLiteCache keeps them in a local file.
+
+Entries are stored per endpoint, under a key built by the client from the
+account and the request parameters. The scalar parameters are kept along
+with each entry so that a mutating call can drop the entries of the entity
+it touched, e.g. follow_club(club_id) drops get_club(club_id).
+
+Cached responses are shared between callers and must not be modified.
+"""
+
+import json
+import time
+import sqlite3
+import threading
+import collections
+
+class TTLCache:
+    """
+    TTLCache Class
+
+    In-memory cache with a time-to-live per entry and least-recently-used
+    eviction once `maxsize` entries are stored.
+
+    `ttls` overrides the time-to-live in seconds of the given endpoints,
+    and can add endpoints that are not cached by default.
+
+    >>> cache = TTLCache(maxsize=4096, ttls={"get_profile": 60})
+    >>> clubhouse = Clubhouse(user_id, user_token, user_device, cache=cache)
+    >>> cache.stats()
+    {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0}
+    """
+
+    def __init__(self, maxsize=1024, ttls=None):
+        """ (TTLCache, int, dict) -> NoneType """
+        self.maxsize = maxsize
+        self.ttls = dict(ttls or {})
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, endpoint, key):
+        """ (TTLCache, str, tuple) -> dict
+
+        Get the cached response, or None if there is none or if it has expired.
+        """
+        with self._lock:
+            entry = self._entries.get((endpoint, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value, _ = entry
+            if expires <= time.monotonic():
+                del self._entries[(endpoint, key)]
+                self.misses += 1
+                return None
+            self._entries.move_to_end((endpoint, key))
+            self.hits += 1
+            return value
+
+    def set(self, endpoint, key, value, ttl, params=None):
+        """ (TTLCache, str, tuple, dict, float, dict) -> NoneType
+
+        Store a response for `ttl` seconds. `params` are the scalar parameters
+        of the request, used by invalidate().
+        """
+        with self._lock:
+            self._entries[(endpoint, key)] = (time.monotonic() + ttl, value, params or {})
+            self._entries.move_to_end((endpoint, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, endpoint, field=None, value=None):
+        """ (TTLCache, str, str, object) -> int
+
+        Drop the entries of the given endpoint, only the ones whose parameter
+        `field` equals `value` if a field is given. Returns the number of dropped entries.
+        """
+        value = str(value)
+        with self._lock:
+            keys = [
+                k for k, (_, _, params) in self._entries.items()
+                if k[0] == endpoint and (field is None or params.get(field) == value)
+            ]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def clear(self):
+        """ (TTLCache) -> NoneType
+
+        Drop every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """ (TTLCache) -> dict
+
+        Get hit/miss/eviction counters and the current number of entries.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+class SQLiteCache:
+    """
+    SQLiteCache Class
+
+    Persistent cache stored in a local SQLite file, so that a restarted
+    crawler does not fetch again what it already has. Same interface as TTLCache.
+
+    Expired entries and the least recently used ones over `maxsize` are
+    removed by compact(), which also runs every `compact_every` writes.
+    Follower and following pages are cached too, unless `ttls` says otherwise.
+
+    >>> cache = SQLiteCache("clubhouse-cache.db", maxsize=1000000)
+    >>> clubhouse = Clubhouse(user_id, user_token, user_device, cache=cache)
+    """
+
+    DEFAULT_TTLS = {
+        "get_followers": 86400,
+        "get_following": 86400,
+    }
+
+    def __init__(self, filename="clubhouse-cache.db", maxsize=100000, ttls=None, compact_every=1000):
+        """ (SQLiteCache, str, int, dict, int) -> NoneType """
+        self.filename = filename
+        self.maxsize = maxsize
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.compact_every = compact_every
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(filename, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "endpoint TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, params TEXT NOT NULL, "
+            "expires REAL NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (endpoint, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, endpoint, key):
+        """ (SQLiteCache, str, tuple) -> dict
+
+        Get the cached response, or None if there is none or if it has expired.
+        """
+        key = json.dumps(key)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires FROM responses WHERE endpoint = ? AND key = ?",
+                (endpoint, key)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed = ? WHERE endpoint = ? AND key = ?",
+                (now, endpoint, key)
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, endpoint, key, value, ttl, params=None):
+        """ (SQLiteCache, str, tuple, dict, float, dict) -> NoneType
+
+        Store a response for `ttl` seconds.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (endpoint, json.dumps(key), json.dumps(value), json.dumps(params or {}), now + ttl, now)
+            )
+            self._writes += 1
+            compact = self.compact_every and self._writes % self.compact_every == 0
+        if compact:
+            self.compact()
+
+    def invalidate(self, endpoint, field=None, value=None):
+        """ (SQLiteCache, str, str, object) -> int
+
+        Drop the entries of the given endpoint, only the ones whose parameter
+        `field` equals `value` if a field is given. Returns the number of dropped entries.
+        """
+        with self._lock:
+            if field is None:
+                return self._db.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,)).rowcount
+            value = str(value)
+            keys = [
+                (endpoint, key) for key, params in self._db.execute(
+                    "SELECT key, params FROM responses WHERE endpoint = ?", (endpoint,)
+                )
+                if json.loads(params).get(field) == value
+            ]
+            self._db.executemany("DELETE FROM responses WHERE endpoint = ? AND key = ?", keys)
+        return len(keys)
+
+    def compact(self, vacuum=False):
+        """ (SQLiteCache, bool) -> NoneType
+
+        Remove expired entries, then the least recently used ones over `maxsize`.
+        With `vacuum`, also give the free pages of the file back to the filesystem.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+            count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.maxsize:
+                self.evictions += self._db.execute(
+                    "DELETE FROM responses WHERE rowid IN "
+                    "(SELECT rowid FROM responses ORDER BY accessed LIMIT ?)",
+                    (count - self.maxsize,)
+                ).rowcount
+            if vacuum:
+                self._db.execute("VACUUM")
+
+    def clear(self):
+        """ (SQLiteCache) -> NoneType
+
+        Drop every entry.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self):
+        """ (SQLiteCache) -> dict
+
+        Get hit/miss/eviction counters and the current number of entries.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self),
+        }
+
+    def close(self):
+        """ (SQLiteCache) -> NoneType
+
+        Close the database file.
+        """
+        with self._lock:
+            self._db.close()
@@ -11,11 +11,26 @@ Please make sure to know what you're trying to do!
 Sending an odd API request could result in a permanent ban on your account.
 """
 
+import json
+import time
 import uuid
 import random
 import secrets
 import functools
+import urllib.parse
+from types import MappingProxyType
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from .paging import iter_pages
+from .singleflight import SingleFlight
+from .keepalive import KeepAlive
+from .models import User, Club, Event, Notification
+from .codec import default_codec
+from .retry import DEFAULT_RETRY_POLICY
+from .deadline import deadline, remaining as deadline_remaining, DeadlineExceeded
+from . import endpoints
+from .endpoints import install_endpoints
 
 class Clubhouse:
     """
@@ -49,7 +64,8 @@ class Clubhouse:
     INSTABUG_KEY = "4e53155da9b00728caa5249f2e35d6b3"
     AMPLITUDE_KEY = "9098a21a950e7cb0933fb5b30affe5be"
 
-    # Useful header information
+    # Useful header information.
+    # This is only a template: each instance builds its own read-only copy.
     HEADERS = {
         "CH-Languages": "en-JP,ja-JP",
         "CH-Locale": "en_JP",
@@ -59,11 +75,31 @@ class Clubhouse:
         "CH-AppBuild": f"{API_BUILD_ID}",
         "CH-AppVersion": f"{API_BUILD_VERSION}",
         "User-Agent": f"{API_UA}",
-        "Connection": "close",
+        "Connection": "keep-alive",
         "Content-Type": "application/json; charset=utf-8",
-        "Cookie": f"__cfduid={secrets.token_hex(21)}{random.randint(1, 9)}"
     }
 
+    # Events of add_hook().
+    HOOK_EVENTS = ("before_send", "after_receive", "on_error")
+
+    # Endpoint tables, by path. Every endpoint is declared in endpoints.py
+
+    # Endpoints with side effects that must not happen twice,
+    # like sending an invitation. These are not retried once sent.
+    NON_IDEMPOTENT_ENDPOINTS = endpoints.NON_IDEMPOTENT_ENDPOINTS
+
+    # Endpoints without side effects. Identical concurrent calls
+    # to these can share a single request.
+    READ_ENDPOINTS = endpoints.READ_ENDPOINTS
+
+    # Default time-to-live in seconds of cached responses, when the client has a cache.
+    CACHE_TTLS = endpoints.CACHE_TTLS
+
+    # Cached responses dropped by a mutating call, as (endpoint, parameter).
+    # Only the entries with the same parameter value as the call are dropped,
+    # or every entry of the endpoint if the parameter is None.
+    CACHE_INVALIDATIONS = endpoints.CACHE_INVALIDATIONS
+
     def require_authentication(func):
         """ Simple decorator to check for the authentication """
         @functools.wraps(func)
@@ -83,14 +119,50 @@ class Clubhouse:
             return func(self, *args, **kwargs)
         return wrap
 
-    def __init__(self, user_id='', user_token='', user_device=''):
-        """ (Clubhouse, str, str, str) -> NoneType
+    def __init__(self, user_id='', user_token='', user_device='', pool_connections=10, pool_maxsize=10, rate_limiter=None, retry_policy=DEFAULT_RETRY_POLICY, timeout=(10, 30), cache=None, coalesce=False, keep_alive=False, codec=None, api_url=None, metrics=None):
+        """ (Clubhouse, str, str, str, int, int, RateLimiter, RetryPolicy, tuple, TTLCache, bool, bool, JSONCodec, str, Metrics) -> NoneType
         Set authenticated information
-        """
-        self.HEADERS['CH-UserID'] = user_id if user_id else "(null)"
+
+        `pool_connections` is the number of hosts to keep connection pools for,
+        and `pool_maxsize` is the number of keep-alive connections kept per host.
+        `rate_limiter` delays calls that go over the budget of their endpoint.
+        `retry_policy` retries transient failures. Set it to None to disable retries.
+        `timeout` is the (connect, read) timeout in seconds of every request.
+        Use `with clubhouse.deadline(seconds):` to bound one or several calls.
+        `cache` caches responses of the endpoints in CACHE_TTLS, in memory or on disk. See cache.py
+        `coalesce` shares one request between identical concurrent calls to READ_ENDPOINTS.
+        `keep_alive` pings the joined channels in the background. See keepalive.py
+        `codec` encodes request bodies and decodes responses, orjson if installed by default. See codec.py
+        `api_url` replaces API_URL, e.g. to use a local mock server. See mock_server.py
+        `metrics` records the calls, status codes, bytes, retries and latencies of every endpoint. See metrics.py
+        """
+        headers = dict(self.HEADERS)
+        headers['Cookie'] = f"__cfduid={secrets.token_hex(21)}{random.randint(1, 9)}"
+        headers['CH-UserID'] = user_id if user_id else "(null)"
         if user_token:
-            self.HEADERS['Authorization'] = f"Token {user_token}"
-        self.HEADERS['CH-DeviceId'] = user_device.upper() if user_device else str(uuid.uuid4()).upper()
+            headers['Authorization'] = f"Token {user_token}"
+        headers['CH-DeviceId'] = user_device.upper() if user_device else str(uuid.uuid4()).upper()
+
+        # Headers are per-instance and never modified afterwards,
+        # so that many accounts can be used concurrently without any locks.
+        self.HEADERS = MappingProxyType(headers)
+        upload_headers = dict(headers)
+        upload_headers.pop("Content-Type")
+        self._upload_headers = MappingProxyType(upload_headers)
+        self.session = self._create_session(pool_connections, pool_maxsize)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.timeout = (timeout, timeout) if isinstance(timeout, (int, float)) else timeout
+        self.cache = cache
+        self._flights = self._single_flight_class() if coalesce else None
+        self.keep_alive = KeepAlive(self, max_workers=pool_maxsize) if keep_alive else None
+        self.codec = codec or default_codec()
+        if api_url:
+            self.API_URL = api_url.rstrip("/")
+        self._urls = {path: f"{self.API_URL}/{path}" for path in endpoints.PATHS}
+        self.metrics = metrics
+        # Registered hooks by event, or None when there are none. See add_hook()
+        self._hooks = None
 
     def __str__(self):
         """ (Clubhouse) -> str
@@ -105,661 +177,423 @@ class Clubhouse:
             self.HEADERS.get('CH-DeviceId')
         )
 
-    def start_phone_number_auth(self, phone_number):
-        """ (Clubhouse, str) -> dict
-
-        Begin phone number authentication.
-        Some examples for the phone number.
-
-        >>> clubhouse = Clubhouse()
-        >>> clubhouse.start_phone_number_auth("+821012341337")
-        ...
-        >>> clubhouse.start_phone_number_auth("+818013371221")
-        ...
-        """
-        if self.HEADERS.get("Authorization"):
-            raise Exception('Already Authenticatied')
-        data = {
-            "phone_number": phone_number
-        }
-        req = requests.post(f"{self.API_URL}/start_phone_number_auth", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    def call_phone_number_auth(self, phone_number):
-        """ (Clubhouse, str) -> dict
-
-        Call the person and send verification message.
-        """
-        if self.HEADERS.get("Authorization"):
-            raise Exception('Already Authenticatied')
-        data = {
-            "phone_number": phone_number
-        }
-        req = requests.post(f"{self.API_URL}/call_phone_number_auth", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    def resend_phone_number_auth(self, phone_number):
-        """ (Clubhouse, str) -> dict
-
-        Resend the verification message
-        """
-        if self.HEADERS.get("Authorization"):
-            raise Exception('Already Authenticatied')
-        data = {
-            "phone_number": phone_number
-        }
-        req = requests.post(f"{self.API_URL}/resend_phone_number_auth", headers=self.HEADERS, json=data)
-        return req.json()
-
-    def complete_phone_number_auth(self, phone_number, verification_code):
-        """ (Clubhouse, str, str) -> dict
-
-        Complete phone number authentication.
-        This should return `auth_token`, `access_token`, `refresh_token`, is_waitlisted, ...
-        Please note that output may be different depending on the status of the authenticated user
-        """
-        if self.HEADERS.get("Authorization"):
-            raise Exception('Already Authenticatied')
-        data = {
-            "phone_number": phone_number,
-            "verification_code": verification_code
-        }
-        req = requests.post(f"{self.API_URL}/complete_phone_number_auth", headers=self.HEADERS, json=data)
-        return req.json()
-
-    def check_for_update(self, is_testflight=False):
-        """ (Clubhouse, bool) -> dict
-
-        Check for app updates.
-
-        >>> clubhouse = Clubhouse()
-        >>> clubhouse.check_for_update(False)
-        {'has_update': False, 'success': True}
-        """
-        query = f"is_testflight={int(is_testflight)}"
-        req = requests.get(f"{self.API_URL}/check_for_update?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_release_notes(self):
-        """ (Clubhouse) -> dict
-
-        Get release notes.
-        """
-        req = requests.post(f"{self.API_URL}/get_release_notes", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def check_waitlist_status(self):
-        """ (Clubhouse) -> dict
-
-        Check whether you're still on a waitlist or not.
-        """
-        req = requests.post(f"{self.API_URL}/check_waitlist_status", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def add_email(self, email):
-        """ (Clubhouse, str) -> dict
-
-        Request for email verification.
-        You only need to do this once.
-        """
-        data = {
-            "email": email
-        }
-        req = requests.post(f"{self.API_URL}/add_email", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_photo(self, photo_filename):
-        """ (Clubhouse, str) -> dict
-
-        Update photo. Please make sure to upload a JPG format.
-        """
-        files = {
-            "file": ("image.jpg", open(photo_filename, "rb"), "image/jpeg"),
-        }
-        tmp = self.HEADERS['Content-Type']
-        self.HEADERS.pop("Content-Type")
-        req = requests.post(f"{self.API_URL}/update_photo", headers=self.HEADERS, files=files)
-        self.HEADERS['Content-Type'] = tmp
-        return req.json()
-
-    @require_authentication
-    def follow(self, user_id, user_ids=None, source=4, source_topic_id=None):
-        """ (Clubhouse, int, list, int, int) -> dict
-
-        Follow a user.
-        Different value for `source` may require different parameters to be set
-        """
-        data = {
-            "source_topic_id": source_topic_id,
-            "user_ids": user_ids,
-            "user_id": int(user_id),
-            "source": source
-        }
-        req = requests.post(f"{self.API_URL}/follow", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def unfollow(self, user_id):
-        """ (Clubhouse, int) -> dict
-
-        Unfollow a user.
-        """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/unfollow", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def block(self, user_id):
-        """ (Clubhouse, int) -> dict
-
-        Block a user.
-        """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/block", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def unblock(self, user_id):
-        """ (Clubhouse, int) -> dict
-
-        Unfollow a user.
-        """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/unblock", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def follow_multiple(self, user_ids, user_id=None, source=7, source_topic_id=None):
-        """ (Clubhouse, list, int, int, int) -> dict
-
-        Follow multiple users at once.
-        Different value for `source` may require different parameters to be set
-        """
-        data = {
-            "source_topic_id": source_topic_id,
-            "user_ids": user_ids,
-            "user_id": user_id,
-            "source": source
-        }
-        req = requests.post(f"{self.API_URL}/follow_multiple", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def follow_club(self, club_id, source_topic_id=None):
-        """ (Clubhouse, int, int) -> dict
-
-        Follow a club
-        """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id
-        }
-        req = requests.post(f"{self.API_URL}/follow_club", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def unfollow_club(self, club_id, source_topic_id=None):
-        """ (Clubhouse, int, int) -> dict
-
-        Unfollow a club
-        """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id
-        }
-        req = requests.post(f"{self.API_URL}/unfollow_club", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_follow_notifications(self, user_id, notification_type=2):
-        """ (Clubhouse, str, int) -> dict
-
-        Update notification frequency for the given user.
-        1 = Always notify, 2 = Sometimes, 3 = Never
-        """
-        data = {
-            "user_id": int(user_id),
-            "notification_type": int(notification_type)
-        }
-        req = requests.post(f"{self.API_URL}/update_follow_notifications", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_follows_similar(self, user_id):
-        """ (Clubhouse, int) -> dict
-
-        Get similar users based on the given user.
-        """
-        data = {
-            "user_id": int(user_id),
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_follows_similar", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_follows_friends_only(self, club_id=None, upload_contacts=True, contacts=()):
-        """ (Clubhouse, int, int, list of dict) -> dict
-
-        Get users based on the phone number.
-        Only seems to be used upon signup.
-        """
-        data = {
-            "club_id": club_id,
-            "upload_contacts": upload_contacts,
-            "contacts": contacts
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_follows_friends_only", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_follows_all(self, in_onboarding=True, page_size=50, page=1):
-        """ (Clubhouse, bool, int, int) -> dict
-
-        Get all suggested follows.
-        """
-        query = "in_onboarding={}&page_size={}&page={}".format(
-            "true" if in_onboarding else "false",
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_suggested_follows_all?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def ignore_suggested_follow(self, user_id):
-        """ (Clubhouse, str) -> dict
-
-        Remove user_id from the suggested follow list.
-        """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/user_id", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_event(self, event_id=None, user_ids=None, club_id=None, is_member_only=False, event_hashid=None, description=None, time_start_epoch=None, name=None):
-        """ (Clubhouse, int, list, int, bool, int, str, int, str) -> dict
-
-        Get details about the event
-        """
-        data = {
-            "user_ids": user_ids,
-            "club_id": club_id,
-            "is_member_only": is_member_only,
-            "event_id": int(event_id) if event_id else None,
-            "event_hashid": event_hashid,
-            "description": description,
-            "time_start_epoch": time_start_epoch,
-            "name": name
-        }
-        req = requests.post(f"{self.API_URL}/get_event", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def create_event(self, name, time_start_epoch, description, event_id=None, user_ids=(), club_id=None, is_member_only=False, event_hashid=None):
-        """ (Clubhouse, str, int, str, int, list, int, bool, int) -> dict
-
-        Create a new event
-        """
-        data = {
-            "user_ids": user_ids,
-            "club_id": club_id,
-            "is_member_only": is_member_only,
-            "event_id": int(event_id) if event_id else None,
-            "event_hashid": event_hashid,
-            "description": description,
-            "time_start_epoch": time_start_epoch,
-            "name": name
-        }
-        req = requests.post(f"{self.API_URL}/edit_event", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def edit_event(self, name, time_start_epoch, description, event_id=None, user_ids=(), club_id=None, is_member_only=False, event_hashid=None):
-        """ (Clubhouse, str, int, str, int, list, int, bool, int) -> dict
-
-        Edit an event.
-        """
-        data = {
-            "user_ids": user_ids,
-            "club_id": club_id,
-            "is_member_only": is_member_only,
-            "event_id": int(event_id) if event_id else None,
-            "event_hashid": event_hashid,
-            "description": description,
-            "time_start_epoch": time_start_epoch,
-            "name": name
-        }
-        req = requests.post(f"{self.API_URL}/edit_event", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def delete_event(self, event_id, user_ids=None, club_id=None, is_member_only=False, event_hashid=None, description=None, time_start_epoch=None, name=None):
-        """ (Clubhouse, str, list, int, bool, int, str, int, str) -> dict
+    def __enter__(self):
+        return self
 
-        Delete event.
-        """
-        data = {
-            "user_ids": user_ids,
-            "club_id": club_id,
-            "is_member_only": is_member_only,
-            "event_id": int(event_id) if event_id else None,
-            "event_hashid": event_hashid,
-            "description": description,
-            "time_start_epoch": time_start_epoch,
-            "name": name
-        }
-        req = requests.post(f"{self.API_URL}/delete_event", headers=self.HEADERS, json=data)
-        return req.json()
+    def __exit__(self, *exc_info):
+        self.close()
 
-    @require_authentication
-    def get_events(self, is_filtered=True, page_size=25, page=1):
-        """ (Clubhouse, bool, int, int) -> dict
+    def _create_session(self, pool_connections, pool_maxsize):
+        """ (Clubhouse, int, int) -> requests.Session
 
-        Get list of upcoming events with details.
+        Create a keep-alive session shared by every endpoint of this client.
         """
-        _is_filtered = "true" if is_filtered else "false"
-        query = "is_filtered={}&page_size={}&page={}".format(
-            "true" if is_filtered else "false",
-            page_size,
-            page
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize
         )
-        req = requests.get(f"{self.API_URL}/get_events?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_club(self, club_id, source_topic_id=None):
-        """ (Clubhouse, int, int) -> dict
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
 
-        Get the information about the given club_id.
-        """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id
-        }
-        req = requests.post(f"{self.API_URL}/get_club", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_club_members(self, club_id, return_followers=False, return_members=True, page_size=50, page=1):
-        """ (Clubhouse, int, bool, bool, int, int) -> dict
-
-        Get list of members on the given club_id.
-        """
-        query = "club_id={}&return_followers={}&return_members={}&page_size={}&page={}".format(
-            club_id,
-            int(return_followers),
-            int(return_members),
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_club_members?{query}", headers=self.HEADERS)
-        return req.json()
+    # Consumes paged endpoints for the iter_* methods.
+    _iter_pages = staticmethod(iter_pages)
 
-    @require_authentication
-    def get_settings(self):
-        """ (Clubhouse) -> dict
+    # Coalesces identical reads in flight.
+    _single_flight_class = SingleFlight
 
-        Receive user's settings.
-        """
-        req = requests.get(f"{self.API_URL}/get_settings", headers=self.HEADERS)
-        return req.json()
+    # Bound a block of calls. See deadline.py
+    deadline = staticmethod(deadline)
 
-    @require_authentication
-    def get_welcome_channel(self):
-        """ (Clubhouse) -> dict
+    def _timeout(self, endpoint):
+        """ (Clubhouse, str) -> (float, float)
 
-        Seems to be called upon sign up. Does not seem to return much data.
+        Get the (connect, read) timeout of the next request, within the current deadline.
         """
-        req = requests.get(f"{self.API_URL}/get_welcome_channel", headers=self.HEADERS)
-        return req.json()
+        left = deadline_remaining()
+        if left is None:
+            return self.timeout
+        if left <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before calling {endpoint}")
+        if self.timeout is None:
+            return (left, left)
+        return (min(self.timeout[0], left), min(self.timeout[1], left))
 
-    @require_authentication
-    def hide_channel(self, channel, hide=True):
-        """ (Clubhouse, str, bool) -> dict
+    def _rate_limit_delay(self, endpoint):
+        """ (Clubhouse, str) -> float
 
-        Hide/unhide the channel from the channel list.
+        Get the seconds to wait before sending a request to the given endpoint.
         """
-        # Join channel
-        data = {
-            "channel": channel,
-            "hide": hide
-        }
-        req = requests.post(f"{self.API_URL}/hide_channel", headers=self.HEADERS, json=data)
-        return req.json()
+        if self.rate_limiter is None:
+            return 0.0
+        delay = self.rate_limiter.reserve(endpoint)
+        left = deadline_remaining()
+        if left is not None and delay >= left:
+            raise DeadlineExceeded(f"Rate limit of {endpoint} exceeds the deadline")
+        return delay
 
-    @require_authentication
-    def join_channel(self, channel, attribution_source="feed", attribution_details="eyJpc19leHBsb3JlIjpmYWxzZSwicmFuayI6MX0="):
-        """ (Clubhouse, str, str) -> dict
+    def _retry_delay(self, endpoint, attempt, status=None, retry_after=None, sent=True):
+        """ (Clubhouse, str, int, int, str, bool) -> float
 
-        Join the given channel
+        Get the seconds to wait before retrying a failed attempt, or None not to retry.
         """
-        data = {
-            "channel": channel,
-            "attribution_source": attribution_source,
-            "attribution_details": attribution_details, # base64_json
-        }
-        req = requests.post(f"{self.API_URL}/join_channel", headers=self.HEADERS, json=data)
-        return req.json()
+        if self.retry_policy is None:
+            return None
+        idempotent = endpoint not in self.NON_IDEMPOTENT_ENDPOINTS
+        if not self.retry_policy.should_retry(attempt, idempotent, status, sent):
+            return None
+        delay = self.retry_policy.delay(attempt, retry_after)
+        left = deadline_remaining()
+        if left is not None and delay >= left:
+            return None
+        return delay
 
-    @require_authentication
-    def leave_channel(self, channel):
-        """ (Clubhouse, str) -> dict
+    def _sent(self, error):
+        """ (Clubhouse, Exception) -> bool
 
-        Leave the given channel
+        Tell whether a request that failed with the given connection error may have reached the server.
+        It did not if the connection could not be opened: refused, unknown host or connect timeout.
         """
-        data = {
-            "channel": channel,
-            "channel_id": None
-        }
-        req = requests.post(f"{self.API_URL}/leave_channel", headers=self.HEADERS, json=data)
-        return req.json()
+        if isinstance(error, requests.ConnectTimeout):
+            return False
+        reason = error.args[0] if error.args else None
+        return not isinstance(getattr(reason, "reason", reason), NewConnectionError)
 
-    @require_authentication
-    def make_channel_public(self, channel, channel_id=None):
-        """ (Clubhouse, str, int) -> dict
+    def _cache_ttl(self, endpoint):
+        """ (Clubhouse, str) -> float
 
-        Make the current channel open to public.
-        Everyone can join the channel.
+        Get the time-to-live of responses of the given endpoint, or None if they are not cached.
         """
-        data = {
-            "channel": channel,
-            "channel_id": channel_id
-        }
-        req = requests.post(f"{self.API_URL}/make_channel_public", headers=self.HEADERS, json=data)
-        return req.json()
+        return self.cache.ttls.get(endpoint, self.CACHE_TTLS.get(endpoint))
 
-    @require_authentication
-    def make_channel_social(self, channel, channel_id=None):
-        """ (Clubhouse, str, int) -> dict
+    def _request_key(self, query, data):
+        """ (Clubhouse, str, dict) -> tuple
 
-        Make the current channel open to public.
-        Only people who user follows can join the channel.
+        Build the key identifying a request of this account, for caching and coalescing.
         """
-        data = {
-            "channel": channel,
-            "channel_id": channel_id
-        }
-        req = requests.post(f"{self.API_URL}/make_channel_social", headers=self.HEADERS, json=data)
-        return req.json()
+        return (self.HEADERS['CH-UserID'], query or "", json.dumps(data, sort_keys=True))
 
-    @require_authentication
-    def end_channel(self, channel, channel_id=None):
-        """ (Clubhouse, str, int) -> dict
+    def _cache_params(self, query, data):
+        """ (Clubhouse, str, dict) -> dict
 
-        Kick everyone and close the channel. Requires moderator privilege.
+        Get the scalar parameters of a request, as strings.
         """
-        data = {
-            "channel": channel,
-            "channel_id": channel_id
-        }
-        req = requests.post(f"{self.API_URL}/end_channel", headers=self.HEADERS, json=data)
-        return req.json()
+        params = dict(urllib.parse.parse_qsl(query or ""))
+        for key, value in (data or {}).items():
+            if isinstance(value, (str, int)):
+                params[key] = str(value)
+        return params
 
-    @require_authentication
-    def make_moderator(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
+    def _cache_store(self, endpoint, key, ttl, query, data, result):
+        """ (Clubhouse, str, tuple, float, str, dict, dict) -> NoneType
 
-        Make the given user moderator. Requires moderator privilege.
+        Cache a successful response.
         """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/make_moderator", headers=self.HEADERS, json=data)
-        return req.json()
+        if isinstance(result, dict) and result.get("success") is not False:
+            self.cache.set(endpoint, key, result, ttl, self._cache_params(query, data))
 
-    @require_authentication
-    def block_from_channel(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
+    def _cache_invalidate(self, endpoint, query, data):
+        """ (Clubhouse, str, str, dict) -> NoneType
 
-        Remove the user from the channel. The user will not be able to re-join.
+        Drop cached responses about the entity touched by a mutating call.
         """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/block_from_channel", headers=self.HEADERS, json=data)
-        return req.json()
+        rules = self.CACHE_INVALIDATIONS.get(endpoint)
+        if not rules:
+            return
+        params = self._cache_params(query, data)
+        for cached_endpoint, field in rules:
+            if field is None:
+                self.cache.invalidate(cached_endpoint)
+            elif field in params:
+                self.cache.invalidate(cached_endpoint, field, params[field])
+            elif field == "user_id":
+                # Calls without a user_id are about the current user.
+                self.cache.invalidate(cached_endpoint, field, self.HEADERS['CH-UserID'])
+
+    def _request(self, method, endpoint, query=None, data=None, files=None):
+        """ (Clubhouse, str, str, str, dict, dict) -> dict
+
+        Send a request to the given endpoint, through the cache if the client has one.
+        Identical reads in flight share one request if the client coalesces them.
+        `query` is the urlencoded query string, `data` is sent as a JSON body.
+        """
+        ttl, key, result = self._lookup(endpoint, query, data)
+        if result is not None:
+            return result
+        if self._coalesces(endpoint):
+            result = self._flights.do((endpoint, key), self._send, method, endpoint, query, data, files)
+        else:
+            result = self._send(method, endpoint, query, data, files)
+        return self._received(endpoint, ttl, key, query, data, result)
+
+    def _coalesces(self, endpoint):
+        """ (Clubhouse, str) -> bool """
+        return self._flights is not None and endpoint in self.READ_ENDPOINTS
+
+    def _lookup(self, endpoint, query, data):
+        """ (Clubhouse, str, str, dict) -> (float, str, dict)
+
+        Get the cache time-to-live of a request, its key if it is cached or
+        coalesced, and its cached response if there is one.
+        """
+        ttl = None if self.cache is None else self._cache_ttl(endpoint)
+        key = None
+        if ttl or self._coalesces(endpoint):
+            key = self._request_key(query, data)
+        result = self.cache.get(endpoint, key) if ttl else None
+        return ttl, key, result
+
+    def _received(self, endpoint, ttl, key, query, data, result):
+        """ (Clubhouse, str, float, str, str, dict, dict) -> dict
+
+        Cache the response of a request, or invalidate the responses it changes,
+        and track the channels it joins or leaves. Returns the response.
+        """
+        if ttl:
+            self._cache_store(endpoint, key, ttl, query, data, result)
+        elif self.cache is not None:
+            self._cache_invalidate(endpoint, query, data)
+        if self.keep_alive is not None:
+            self.keep_alive.observe(endpoint, data, result)
+        return result
+
+    def _send(self, method, endpoint, query=None, data=None, files=None):
+        """ (Clubhouse, str, str, str, dict, dict) -> dict
+
+        Send a request to the given endpoint over the pooled session.
+        """
+        if self.metrics is not None or self._hooks is not None:
+            return self._send_observed(method, endpoint, query, data, files)
+        return self._decode(self._transmit(method, endpoint, query, data, files)[0])
+
+    def _send_observed(self, method, endpoint, query=None, data=None, files=None):
+        """ (Clubhouse, str, str, str, dict, dict) -> dict
+
+        Send a request like _send(), through the hooks and the metrics of the client.
+        """
+        context, start = self._before_send(method, endpoint, query, data)
+        attempts = [0]
+        status = sent = received = 0
+        try:
+            req, sent = self._transmit(method, endpoint, query, data, files, attempts)
+            status = req.status_code
+            received = len(req.content)
+            result = self._decode(req)
+        except BaseException as ex:
+            self._after_send(context, start, attempts[0], status or type(ex).__name__, sent, received, error=ex)
+            raise
+        return self._after_send(context, start, attempts[0], status, sent, received, result)
+
+    def _before_send(self, method, endpoint, query, data):
+        """ (Clubhouse, str, str, str, dict) -> (dict, float)
+
+        Run the before_send hooks of a request. Returns their context and the start time of the request.
+        """
+        context = {"client": self, "endpoint": endpoint, "method": method, "query": query, "data": data}
+        if self._hooks is not None:
+            for hook in self._hooks["before_send"]:
+                hook(context)
+        return context, time.perf_counter()
+
+    def _after_send(self, context, start, attempts, status, sent, received, result=None, error=None):
+        """ (Clubhouse, dict, float, int, int or str, int, int, dict, BaseException) -> dict
+
+        Record a request in the metrics and run the after_receive hooks,
+        or the on_error hooks if it raised `error`. Returns the response.
+        """
+        elapsed = time.perf_counter() - start
+        if self.metrics is not None:
+            self.metrics.record(context["endpoint"], status, elapsed, sent, received, max(0, attempts - 1))
+        if self._hooks is not None:
+            if error is None:
+                context.update(status=status, result=result, elapsed=elapsed, attempts=attempts)
+                for hook in self._hooks["after_receive"]:
+                    hook(context)
+            elif isinstance(error, Exception):
+                context.update(status=status, error=error, elapsed=elapsed, attempts=attempts)
+                for hook in self._hooks["on_error"]:
+                    hook(context)
+        return result
+
+    def _transmit(self, method, endpoint, query=None, data=None, files=None, attempts=None):
+        """ (Clubhouse, str, str, str, dict, dict, list) -> (requests.Response, int)
+
+        Send a request until it succeeds or should not be retried anymore.
+        Returns the last response and the bytes of request bodies sent.
+        `attempts[0]`, if given, is kept at the number of attempts made so far.
+        """
+        body = None if files or data is None else self.codec.encode(data)
+        url = self._urls.get(endpoint) or f"{self.API_URL}/{endpoint}"
+        attempt = 0
+        while True:
+            attempt += 1
+            if attempts is not None:
+                attempts[0] = attempt
+            delay = self._rate_limit_delay(endpoint)
+            if delay:
+                time.sleep(delay)
+            if files and attempt > 1:
+                for _, fileobj, _ in files.values():
+                    fileobj.seek(0)
+            try:
+                req = self.session.request(
+                    method,
+                    url,
+                    headers=self._upload_headers if files else self.HEADERS,
+                    params=query,
+                    data=body,
+                    files=files,
+                    timeout=self._timeout(endpoint)
+                )
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                left = deadline_remaining()
+                if left is not None and left <= 0:
+                    raise DeadlineExceeded(f"Deadline exceeded while calling {endpoint}") from ex
+                delay = self._retry_delay(endpoint, attempt, sent=self._sent(ex))
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            delay = self._retry_delay(endpoint, attempt, req.status_code, req.headers.get("Retry-After"))
+            if delay is None:
+                return req, len(body or b"") * attempt
+            time.sleep(delay)
+
+    def _decode(self, req):
+        """ (Clubhouse, requests.Response) -> dict
+
+        Decode a response of the API.
+        """
+        try:
+            return self.codec.decode(req.content)
+        except ValueError:
+            # Not an API error message. Raise the HTTP error if there is one.
+            req.raise_for_status()
+            raise
+
+    def add_hook(self, event, func):
+        """ (Clubhouse, str, callable) -> NoneType
+
+        Call `func(context)` around every request sent by this client.
+        `event` is one of HOOK_EVENTS:
+
+            before_send    before the first attempt of a call
+            after_receive  after the response of a call is decoded
+            on_error       when a call raises, before the exception propagates
+
+        `context` is a dict shared by the hooks of one call, holding the client,
+        endpoint, method, query and data, then the status, elapsed seconds and
+        attempts, and the decoded result or the error. Hooks may keep their own
+        keys in it, e.g. a tracing span. Exceptions raised by hooks propagate.
+        Hooks are plain functions, on AsyncClubhouse too, and they are not
+        called for cached or coalesced calls.
+        """
+        if event not in self.HOOK_EVENTS:
+            raise ValueError(f"Unknown hook event: {event}")
+        hooks = dict(self._hooks or {x: () for x in self.HOOK_EVENTS})
+        hooks[event] += (func,)
+        self._hooks = hooks
+
+    def remove_hook(self, event, func):
+        """ (Clubhouse, str, callable) -> NoneType
+
+        Stop calling a hook added by add_hook().
+        """
+        if self._hooks is None or func not in self._hooks.get(event, ()):
+            raise ValueError(f"Hook not found: {event}")
+        hooks = dict(self._hooks)
+        funcs = list(hooks[event])
+        funcs.remove(func)
+        hooks[event] = tuple(funcs)
+        # Without hooks, requests skip the observed path entirely.
+        self._hooks = hooks if any(hooks.values()) else None
+
+    def close(self):
+        """ (Clubhouse) -> NoneType
+
+        Close every pooled connection. The client should not be used afterwards.
+        """
+        if self.keep_alive is not None:
+            self.keep_alive.stop()
+        self.session.close()
 
     @require_authentication
-    def get_profile(self, user_id):
+    def update_photo(self, photo_filename):
         """ (Clubhouse, str) -> dict
 
-        Lookup someone else's profile. It is OK to one's own profile with this method.
-        """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/get_profile", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def me(self, return_blocked_ids=False, timezone_identifier="Asia/Tokyo", return_following_ids=False):
-        """ (Clubhouse, bool, str, bool) -> dict
-
-        Get my information
+        Update photo. Please make sure to upload a JPG format.
         """
-        data = {
-            "return_blocked_ids": return_blocked_ids,
-            "timezone_identifier": timezone_identifier,
-            "return_following_ids": return_following_ids
+        files = {
+            "file": ("image.jpg", open(photo_filename, "rb"), "image/jpeg"),
         }
-        req = requests.post(f"{self.API_URL}/me", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_following(self, user_id, page_size=50, page=1):
-        """ (Clubhouse, str, int, int) -> dict
-
-        Get following users type2
-        """
-        query = "user_id={}&page_size={}&page={}".format(
-            user_id,
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_following?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_followers(self, user_id, page_size=50, page=1):
-        """ (Clubhouse, str, int, int) -> dict
-
-        Get followers of the given user_id.
-        """
-        query = "user_id={}&page_size={}&page={}".format(
-            user_id,
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_followers?{query}", headers=self.HEADERS)
-        return req.json()
+        return self._request("POST", "update_photo", files=files)
 
-    @require_authentication
-    def get_mutual_follows(self, user_id, page_size=50, page=1):
-        """ (Clubhouse, str, int, int) -> dict
+    def iter_suggested_follows_all(self, in_onboarding=True, page_size=50, prefetch=False, concurrency=1, ordered=True, typed=False):
+        """ (Clubhouse, bool, int, bool, int, bool, bool) -> generator of dict
 
-        Get mutual followers between the current user and the given user_id.
+        Iterate over all suggested follows.
+        Pages are fetched lazily. Set `prefetch` to fetch the next page in the background,
+        or `concurrency` to fetch that many pages in parallel, yielded in page order unless `ordered` is False.
+        With `typed`, items are User models. See models.py
         """
-        query = "user_id={}&page_size={}&page={}".format(
-            user_id,
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_mutual_follows?{query}", headers=self.HEADERS)
-        return req.json()
+        fetch = functools.partial(self.get_suggested_follows_all, in_onboarding, page_size=page_size)
+        return self._iter_pages(fetch, "users", page_size, prefetch, concurrency, ordered, User.from_dict if typed else None)
 
-    @require_authentication
-    def get_all_topics(self):
-        """ (Clubhouse) -> dict
+    def iter_events(self, is_filtered=True, page_size=25, prefetch=False, concurrency=1, ordered=True, typed=False):
+        """ (Clubhouse, bool, int, bool, int, bool, bool) -> generator of dict
 
-        Get list of topics, based on the server's channel selection algorithm
+        Iterate over every upcoming event.
+        Pages are fetched lazily. Set `prefetch` to fetch the next page in the background,
+        or `concurrency` to fetch that many pages in parallel, yielded in page order unless `ordered` is False.
+        With `typed`, items are Event models. See models.py
         """
-        req = requests.get(f"{self.API_URL}/get_all_topics", headers=self.HEADERS)
-        return req.json()
+        fetch = functools.partial(self.get_events, is_filtered, page_size=page_size)
+        return self._iter_pages(fetch, "events", page_size, prefetch, concurrency, ordered, Event.from_dict if typed else None)
 
-    @require_authentication
-    def get_channels(self):
-        """ (Clubhouse) -> dict
+    def iter_club_members(self, club_id, return_followers=False, return_members=True, page_size=50, prefetch=False, concurrency=1, ordered=True, typed=False):
+        """ (Clubhouse, int, bool, bool, int, bool, int, bool, bool) -> generator of dict
 
-        Get list of channels, based on the server's channel selection algorithm
+        Iterate over every member of the given club_id.
+        Pages are fetched lazily. Set `prefetch` to fetch the next page in the background,
+        or `concurrency` to fetch that many pages in parallel, yielded in page order unless `ordered` is False.
+        With `typed`, items are User models. See models.py
         """
-        req = requests.get(f"{self.API_URL}/get_channels", headers=self.HEADERS)
-        return req.json()
+        fetch = functools.partial(self.get_club_members, club_id, return_followers, return_members, page_size=page_size)
+        return self._iter_pages(fetch, "users", page_size, prefetch, concurrency, ordered, User.from_dict if typed else None)
 
-    @require_authentication
-    def get_channel(self, channel, channel_id=None):
-        """ (Clubhouse, str, int) -> dict
+    def iter_following(self, user_id, page_size=50, prefetch=False, concurrency=1, ordered=True, typed=False):
+        """ (Clubhouse, str, int, bool, int, bool, bool) -> generator of dict
 
-        Get information of the given channel
+        Iterate over every user the given user_id follows.
+        Pages are fetched lazily. Set `prefetch` to fetch the next page in the background,
+        or `concurrency` to fetch that many pages in parallel, yielded in page order unless `ordered` is False.
+        With `typed`, items are User models. See models.py
         """
-        data = {
-            "channel": channel,
-            "channel_id": channel_id
-        }
-        req = requests.post(f"{self.API_URL}/get_channel", headers=self.HEADERS, json=data)
-        return req.json()
+        fetch = functools.partial(self.get_following, user_id, page_size=page_size)
+        return self._iter_pages(fetch, "users", page_size, prefetch, concurrency, ordered, User.from_dict if typed else None)
 
-    @require_authentication
-    def active_ping(self, channel):
-        """ (Clubhouse, str) -> dict
+    def iter_followers(self, user_id, page_size=50, prefetch=False, concurrency=1, ordered=True, typed=False):
+        """ (Clubhouse, str, int, bool, int, bool, bool) -> generator of dict
 
-        Keeping the user active while being in a chatroom
+        Iterate over every follower of the given user_id.
+        Pages are fetched lazily. Set `prefetch` to fetch the next page in the background,
+        or `concurrency` to fetch that many pages in parallel, yielded in page order unless `ordered` is False.
+        With `typed`, items are User models. See models.py
         """
-        data = {
-            "channel": channel,
-            "chanel_id": None
-        }
-        req = requests.post(f"{self.API_URL}/active_ping", headers=self.HEADERS, json=data)
-        return req.json()
+        fetch = functools.partial(self.get_followers, user_id, page_size=page_size)
+        return self._iter_pages(fetch, "users", page_size, prefetch, concurrency, ordered, User.from_dict if typed else None)
 
-    @require_authentication
-    def audience_reply(self, channel, raise_hands=True, unraise_hands=False):
-        """ (Clubhouse, str, bool, bool) -> bool
+    def iter_mutual_follows(self, user_id, page_size=50, prefetch=False, concurrency=1, ordered=True, typed=False):
+        """ (Clubhouse, str, int, bool, int, bool, bool) -> generator of dict
 
-        Request for raise_hands.
+        Iterate over every mutual follower between the current user and the given user_id.
+        Pages are fetched lazily. Set `prefetch` to fetch the next page in the background,
+        or `concurrency` to fetch that many pages in parallel, yielded in page order unless `ordered` is False.
+        With `typed`, items are User models. See models.py
         """
-        data = {
-            "channel": channel,
-            "raise_hands": raise_hands,
-            "unraise_hands": unraise_hands
-        }
-        req = requests.post(f"{self.API_URL}/audience_reply", headers=self.HEADERS, json=data)
-        return req.json()
+        fetch = functools.partial(self.get_mutual_follows, user_id, page_size=page_size)
+        return self._iter_pages(fetch, "users", page_size, prefetch, concurrency, ordered, User.from_dict if typed else None)
 
     @require_authentication
     def change_handraise_settings(self, channel, is_enabled=True, handraise_permission=1):
@@ -783,8 +617,7 @@ class Clubhouse:
             "is_enabled": is_enabled,
             "handraise_permission": handraise_permission
         }
-        req = requests.post(f"{self.API_URL}/change_handraise_settings", headers=self.HEADERS, json=data)
-        return req.json()
+        return self._request("POST", "change_handraise_settings", data=data)
 
     @require_authentication
     def update_skintone(self, skintone=1):
@@ -798,757 +631,40 @@ class Clubhouse:
         data = {
             "skintone": skintone
         }
-        req = requests.post(f"{self.API_URL}/update_skintone", headers=self.HEADERS, json=data)
-        return req.json()
+        return self._request("POST", "update_skintone", data=data)
 
-    @require_authentication
-    def get_notifications(self, page_size=20, page=1):
-        """ (Clubhouse, int, int) -> dict
+    def iter_notifications(self, page_size=20, prefetch=False, concurrency=1, ordered=True, typed=False):
+        """ (Clubhouse, int, bool, int, bool, bool) -> generator of dict
 
-        Get my notifications.
+        Iterate over all my notifications.
+        Pages are fetched lazily. Set `prefetch` to fetch the next page in the background,
+        or `concurrency` to fetch that many pages in parallel, yielded in page order unless `ordered` is False.
+        With `typed`, items are Notification models. See models.py
         """
-        query = f"page_size={page_size}&page={page}"
-        req = requests.get(f"{self.API_URL}/get_notifications?{query}", headers=self.HEADERS)
-        return req.json()
+        fetch = functools.partial(self.get_notifications, page_size=page_size)
+        return self._iter_pages(fetch, "notifications", page_size, prefetch, concurrency, ordered, Notification.from_dict if typed else None)
 
-    @require_authentication
-    def get_actionable_notifications(self):
-        """ (Clubhouse, int, int) -> dict
-
-        Get notifications. This may return some notifications that require some actions
-        """
-        req = requests.get(f"{self.API_URL}/get_actionable_notifications", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_online_friends(self):
-        """ (Clubhouse) -> dict
-
-        List all online friends.
-        """
-        req = requests.post(f"{self.API_URL}/get_online_friends", headers=self.HEADERS, json={})
-        return req.json()
-
-    @require_authentication
-    def accept_speaker_invite(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Accept speaker's invitation, based on the (channel, invited_moderator)
-        `raise_hands` needs to be called first, prior to the invitation.
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/accept_speaker_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def reject_speaker_invite(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Reject speaker's invitation.
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/reject_speaker_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def invite_speaker(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
+    def iter_clubs_for_topic(self, topic_id, page_size=25, prefetch=False, concurrency=1, ordered=True, typed=False):
+        """ (Clubhouse, int, int, bool, int, bool, bool) -> generator of dict
 
-        Move audience to speaker. Requires moderator privilege.
+        Iterate over every club of the given topic id.
+        Pages are fetched lazily. Set `prefetch` to fetch the next page in the background,
+        or `concurrency` to fetch that many pages in parallel, yielded in page order unless `ordered` is False.
+        With `typed`, items are Club models. See models.py
         """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/invite_speaker", headers=self.HEADERS, json=data)
-        return req.json()
+        fetch = functools.partial(self.get_clubs_for_topic, topic_id, page_size=page_size)
+        return self._iter_pages(fetch, "clubs", page_size, prefetch, concurrency, ordered, Club.from_dict if typed else None)
 
-    @require_authentication
-    def uninvite_speaker(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
+    def iter_users_for_topic(self, topic_id, page_size=25, prefetch=False, concurrency=1, ordered=True, typed=False):
+        """ (Clubhouse, int, int, bool, int, bool, bool) -> generator of dict
 
-        Move speaker to audience. Requires moderator privilege.
+        Iterate over every user of the given topic id.
+        Pages are fetched lazily. Set `prefetch` to fetch the next page in the background,
+        or `concurrency` to fetch that many pages in parallel, yielded in page order unless `ordered` is False.
+        With `typed`, items are User models. See models.py
         """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/uninvite_speaker", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def mute_speaker(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Mute speaker. Requires moderator privilege
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/mute_speaker", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_speakers(self, channel):
-        """ (Clubhouse, str) -> dict
-
-        Get suggested speakers from the given channel
-        """
-        data = {
-            "channel": channel
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_speakers", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def create_channel(self, topic="", user_ids=(), is_private=False, is_social_mode=False):
-        """ (Clubhouse, str, list, bool, bool) -> dict
-
-        Create a new channel. Type of the room can be changed
-        """
-        data = {
-            "is_social_mode": is_social_mode,
-            "is_private": is_private,
-            "club_id": None,
-            "user_ids": user_ids,
-            "event_id": None,
-            "topic": topic
-        }
-        req = requests.post(f"{self.API_URL}/create_channel", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_create_channel_targets(self):
-        """ (Clubhouse) -> dict
-
-        Not sure what this does. Triggered upon channel creation
-        """
-        data = {}
-        req = requests.post(f"{self.API_URL}/get_create_channel_targets", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_invites(self, club_id=None, upload_contacts=True, contacts=()):
-        """ (Clubhouse, int, bool, list of dict) -> dict
-
-        Get invitations and user lists based on phone number.
-
-        contacts(dict)
-            - example: [{"name": "Test Name", "phone_number": "+821043219876"}, ...]
-        """
-        data = {
-            "club_id": club_id,
-            "upload_contacts": upload_contacts,
-            "contacts": contacts
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_invites", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_club_invites(self, upload_contacts=True, contacts=()):
-        """ (Clubhouse, int, bool, list of dict) -> dict
-
-        Get user lists based on phone number. For inviting clubs.
-
-        contacts(dict)
-            - example: [{"name": "Test Name", "phone_number": "+821043219876"}, ...]
-        """
-        data = {
-            "upload_contacts": upload_contacts,
-            "contacts": contacts
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_club_invites", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def invite_to_app(self, name, phone_number, message=None):
-        """ (Clubhouse, str, str, str) -> dict
-
-        Invite users to app. but this only works when you have a leftover invitation.
-        """
-        data = {
-            "name": name,
-            "phone_number": phone_number,
-            "message": message
-        }
-        req = requests.post(f"{self.API_URL}/invite_to_app", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def invite_from_waitlist(self, user_id):
-        """ (Clubhouse, str, str, str) -> dict
-
-        Invite someone from the waitlist.
-        This is much more reliable than inviting someone by invite_to_app
-        """
-        data = {
-            "user_id": int(user_id),
-        }
-        req = requests.post(f"{self.API_URL}/invite_from_waitlist", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def search_users(self, query, followers_only=False, following_only=False, cofollows_only=False):
-        """ (Clubhouse, str, bool, bool, bool) -> dict
-
-        Search users based on the given query.
-        """
-        data = {
-            "cofollows_only": cofollows_only,
-            "following_only": following_only,
-            "followers_only": followers_only,
-            "query": query
-        }
-        req = requests.post(f"{self.API_URL}/search_users", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def search_clubs(self, query, followers_only=False, following_only=False, cofollows_only=False):
-        """ (Clubhouse, str, bool, bool, bool) -> dict
-
-        Search clubs based on the given query.
-        """
-        data = {
-            "cofollows_only": cofollows_only,
-            "following_only": following_only,
-            "followers_only": followers_only,
-            "query": query
-        }
-        req = requests.post(f"{self.API_URL}/search_clubs", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_topic(self, topic_id):
-        """ (Clubhouse, int) -> dict
-
-        Get topic's information based on the given topic id.
-        """
-        data = {
-            "topic_id": int(topic_id)
-        }
-        req = requests.post(f"{self.API_URL}/get_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_clubs_for_topic(self, topic_id, page_size=25, page=1):
-        """ (Clubhouse, int, int, int) -> dict
-
-        Get list of clubs based on the given topic id.
-        """
-        query = "topic_id={}&page_size={}&page={}".format(
-            topic_id,
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_clubs_for_topic?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_clubs(self, is_startable_only):
-        """ (Clubhouse, bool) -> dict
-
-        Get list of clubs the user's in.
-        """
-        data = {
-            "is_startable_only": is_startable_only
-        }
-        req = requests.post(f"{self.API_URL}/get_clubs", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_users_for_topic(self, topic_id, page_size=25, page=1):
-        """ (Clubhouse, int, int, int) -> dict
-
-        Get list of users based on the given topic id.
-        """
-        query = "topic_id={}&page_size={}&page={}".format(
-            topic_id,
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_users_for_topic?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def invite_to_existing_channel(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Invite someone to a currently joined channel.
-        It will send a ping notification to the given user_id.
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/invite_to_existing_channel", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_username(self, username):
-        """ (Clubhouse, str) -> dict
-
-        Change username. YOU HAVE LIMITED NUMBER OF TRIALS TO CHANGE YOUR USERNAME.
-        """
-        data = {
-            "username": username,
-        }
-        req = requests.post(f"{self.API_URL}/update_username", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_name(self, name):
-        """ (Clubhouse, str) -> dict
-
-        Change your legal name. Be careful of what you're trying to enter.
-            (1) Upon registration
-            (2) Changing your legal name. YOU CAN ONLY DO THIS ONCE.
-        """
-        data = {
-            "name": name,
-        }
-        req = requests.post(f"{self.API_URL}/update_name", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_twitter_username(self, username, twitter_token, twitter_secret):
-        """ (Clubhouse, str, str, str) -> dict
-
-        Change Twitter username based on Twitter Token.
-
-        >>> client.update_twitter_username(None, None, None) # Clear username
-        >>> client.update_twitter_username("stereotype32", "...", "...") # Set username
-        """
-        data = {
-            "username": username,
-            "twitter_token": twitter_token,
-            "twitter_secret": twitter_secret
-        }
-        req = requests.post(f"{self.API_URL}/update_twitter_username", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_instagram_username(self, code):
-        """ (Clubhouse, str) -> dict
-
-        Change Twitter username based on Instagram token.
-
-        >>> client.update_instagram_username(None) # Clear username
-        >>> client.update_instagram_username("...") # Set username
-        """
-        data = {
-            "code": code
-        }
-        req = requests.post(f"{self.API_URL}/update_instagram_username", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_displayname(self, name):
-        """ (Clubhouse, str) -> dict
-
-        Change your nickname. YOU CAN ONLY DO THIS ONCE.
-        """
-        data = {
-            "name": name,
-        }
-        req = requests.post(f"{self.API_URL}/update_name", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def refresh_token(self, refresh_token):
-        """ (Clubhouse, str) -> dict
-
-        Refresh the JWT token. returns both access and refresh token.
-        """
-        data = {
-            "refresh": refresh_token
-        }
-        req = requests.post(f"{self.API_URL}/refresh_token", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_bio(self, bio):
-        """ (Clubhouse, str) -> dict
-
-        Update bio on your profile
-        """
-        data = {
-            "bio": bio
-        }
-        req = requests.post(f"{self.API_URL}/update_bio", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def record_action_trails(self, action_trails=()):
-        """ (Clubhouse, list of dict) -> dict
-
-        Recording actions of the user interactions while using the app.
-        action_trails: [{"blob_data":{}, "trail_type": "...", ...}, ...]
-        """
-        data = {
-            "action_trails": action_trails
-        }
-        req = requests.post(f"{self.API_URL}/update_bio", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def add_user_topic(self, club_id=None, topic_id=None):
-        """ (Clubhouse, int, int) -> dict
-
-        Add user's interest.
-
-        Some interesting flags for Language has been shared in the following link.
-        Reference: https://github.com/grishka/Houseclub/issues/24
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "topic_id": int(topic_id) if topic_id else None
-        }
-        req = requests.post(f"{self.API_URL}/add_user_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def remove_user_topic(self, club_id=None, topic_id=None):
-        """ (Clubhouse, int, int) -> dict
-
-        Remove user's interest
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "topic_id": int(topic_id) if topic_id else None
-        }
-        req = requests.post(f"{self.API_URL}/remove_user_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def report_incident(self, user_id, channel, incident_type, incident_description, email):
-        """ (Clubhouse, int, str, unknown, str, str) -> dict
-
-        Report incident
-        There seemed to be a field for attachment, need to trace this later
-        """
-        data = {
-            "user_id": int(user_id),
-            "channel": channel,
-            "incident_type": incident_type,
-            "incident_description": incident_description,
-            "email": email
-        }
-        req = requests.post(f"{self.API_URL}/report_incident", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def reject_welcome_channel(self):
-        """ (Clubhouse) -> dict
-
-        Unknown
-        """
-        req = requests.get(f"{self.API_URL}/reject_welcome_channel", headers=self.HEADERS)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_channel_flags(self, channel, visibility, flag_title, unflag_title):
-        """ (Clubhouse, str, bool, unknown, unknown) -> dict
-
-        Unknown
-        """
-        data = {
-            "channel": channel,
-            "visibility": visibility,
-            "flag_title": flag_title,
-            "unflag_title": unflag_title,
-        }
-        req = requests.post(f"{self.API_URL}/update_channel_flags", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def ignore_actionable_notification(self, actionable_notification_id):
-        """ (Clubhouse, int) -> dict
-
-        Ignore the actionable notification.
-        """
-        data = {
-            "actionable_notification_id": actionable_notification_id
-        }
-        req = requests.post(f"{self.API_URL}/ignore_actionable_notification", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def invite_to_new_channel(self, user_id, channel):
-        """ (Clubhouse, int, str) -> dict
-
-        Invite someone to the channel
-        """
-        data = {
-            "user_id": int(user_id),
-            "channel": channel
-        }
-        req = requests.post(f"{self.API_URL}/invite_to_new_channel", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def accept_new_channel_invite(self, channel_invite_id):
-        """ (Clubhouse, int) -> dict
-
-        Accept Channel Invitation
-        """
-        data = {
-            "channel_invite_id": channel_invite_id
-        }
-        req = requests.post(f"{self.API_URL}/accept_new_channel_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def reject_new_channel_invite(self, channel_invite_id):
-        """ (Clubhouse, int) -> dict
-
-        Reject Channel Invitation
-        """
-        data = {
-            "channel_invite_id": channel_invite_id
-        }
-        req = requests.post(f"{self.API_URL}/reject_new_channel_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def cancel_new_channel_invite(self, channel_invite_id):
-        """ (Clubhouse, int) -> dict
-
-        Cancel Channel Invitation
-        """
-        data = {
-            "channel_invite_id": channel_invite_id
-        }
-        req = requests.post(f"{self.API_URL}/cancel_new_channel_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def add_club_admin(self, club_id, user_id):
-        """ (Clubhouse, int, int) -> dict
-
-        Add Club Admin. Requires privilege.
-        """
-        data = {
-            "club_id": int(club_id),
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/add_club_admin", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def remove_club_admin(self, club_id, user_id):
-        """ (Clubhouse, int, int) -> dict
-
-        Remove Club admin. Requires privilege.
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/remove_club_admin", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def remove_club_member(self, club_id, user_id):
-        """ (Clubhouse, int, int) -> dict
-
-        Remove Club member. Requires privilege.
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/remove_club_member", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def accept_club_member_invite(self, club_id, source_topic_id=None):
-        """ (Clubhouse, int, int) -> dict
-
-        Accept Club member invite.
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "source_topic_id": source_topic_id
-        }
-        req = requests.post(f"{self.API_URL}/accept_club_member_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def add_club_member(self, club_id, user_id, name, phone_number, message, reason):
-        """ (Clubhouse, int, int, str, str, str, unknown) -> dict
-
-        Add club member
-        """
-        data = {
-            "club_id": int(club_id),
-            "user_id": int(user_id),
-            "name": name,
-            "phone_number": phone_number,
-            "message": message,
-            "reason": reason
-        }
-        req = requests.post(f"{self.API_URL}/add_club_member", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def get_club_nominations(self, club_id, source_topic_id):
-        """ (Club, int, int) -> dict
-
-        Get club nomination list
-        """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id
-        }
-        req = requests.post(f"{self.API_URL}/get_club_nominations", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def approve_club_nomination(self, club_id, source_topic_id, invite_nomination_id):
-        """ (Club, int, int) -> dict
-
-        Approve club nomination
-        """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id,
-            "invite_nomination_id": invite_nomination_id
-        }
-        req = requests.post(f"{self.API_URL}/approve_club_nomination", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def reject_club_nomination(self, club_id, source_topic_id, invite_nomination_id):
-        """ (Club, int, int) -> dict
-
-        Reject club nomination
-        """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id,
-            "invite_nomination_id": invite_nomination_id
-        }
-        req = requests.post(f"{self.API_URL}/approve_club_nomination", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def add_club_topic(self, club_id, topic_id):
-        """ (Club, int, int) -> dict
-
-        Add club topic
-        """
-        data = {
-            "club_id": int(club_id),
-            "topic_id": int(topic_id)
-        }
-        req = requests.post(f"{self.API_URL}/add_club_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def remove_club_topic(self, club_id, topic_id):
-        """ (Club, int, int) -> dict
-
-        Remove club topic
-        """
-        data = {
-            "club_id": int(club_id),
-            "topic_id": int(topic_id)
-        }
-        req = requests.post(f"{self.API_URL}/remove_club_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def get_events_to_start(self):
-        """ (Clubhouse) -> dict
-
-        Get events to start
-        """
-        req = requests.get(f"{self.API_URL}/get_events_to_start", headers=self.HEADERS)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_is_follow_allowed(self, club_id, is_follow_allowed=True):
-        """ (Clubhouse, int, bool) -> dict
-
-        Update follow button of the given Club
-        """
-        data = {
-            "club_id": int(club_id),
-            "is_follow_allowed": is_follow_allowed
-        }
-        req = requests.post(f"{self.API_URL}/update_is_follow_allowed", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_is_membership_private(self, club_id, is_membership_private):
-        """ (Clubhouse, int, bool) -> dict
-
-        Update membership status of the given Club
-        """
-        data = {
-            "club_id": int(club_id),
-            "is_membership_private": is_membership_private
-        }
-        req = requests.post(f"{self.API_URL}/update_is_membership_private", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_is_community(self, club_id, is_community):
-        """ (Clubhouse, int, bool) -> dict
-
-        Update community stat of the given Club
-        """
-        data = {
-            "club_id": int(club_id),
-            "is_community": is_community
-        }
-        req = requests.post(f"{self.API_URL}/update_is_community", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_club_description(self, club_id, description):
-        """ (Clubhouse, int, str) -> dict
-
-        Update description of the given Club
-        """
-        data = {
-            "club_id": int(club_id),
-            "description": description
-        }
-        req = requests.post(f"{self.API_URL}/update_club_description", headers=self.HEADERS, json=data)
-        return req.json()
+        fetch = functools.partial(self.get_users_for_topic, topic_id, page_size=page_size)
+        return self._iter_pages(fetch, "users", page_size, prefetch, concurrency, ordered, User.from_dict if typed else None)
 
     @unstable_endpoint
     @require_authentication
@@ -1576,3 +692,6 @@ class Clubhouse:
         Not implemented method
         """
         raise NotImplementedError("Not Implemented!")
+
+# Generate the endpoint methods that are not written above. See endpoints.py
+install_endpoints(Clubhouse)
@@ -0,0 +1,73 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+codec.py
+
+JSON codecs for request and response bodies.
+Bodies are encoded to and decoded from bytes directly, without going
+through an intermediate str.
+
+orjson is used when it is installed (pip3 install clubhouse-py[fast]),
+the standard json module otherwise.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class JSONCodec:
+    """
+    JSONCodec Class
+
+    Codec based on the standard json module.
+    """
+
+    name = "json"
+
+    def encode(self, obj):
+        """ (JSONCodec, object) -> bytes """
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, data):
+        """ (JSONCodec, bytes) -> object
+
+        Raises ValueError if the data is not valid JSON.
+        """
+        return json.loads(data)
+
+class OrjsonCodec:
+    """
+    OrjsonCodec Class
+
+    Codec based on orjson, several times faster than the json module on
+    large responses such as get_channel or follower pages.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        """ (OrjsonCodec) -> NoneType """
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson. (pip3 install orjson)")
+
+    def encode(self, obj):
+        """ (OrjsonCodec, object) -> bytes """
+        return orjson.dumps(obj)
+
+    def decode(self, data):
+        """ (OrjsonCodec, bytes) -> object
+
+        Raises ValueError if the data is not valid JSON.
+        """
+        return orjson.loads(data)
+
+def default_codec():
+    """ () -> JSONCodec or OrjsonCodec
+
+    Get the fastest codec available.
+    """
+    return OrjsonCodec() if orjson is not None else JSONCodec()
@@ -0,0 +1,316 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+crawler.py
+
+Crawl the follower graph from a set of seed users, breadth first or by
+priority, with periodic checkpoints so that a killed crawl can resume.
+"""
+
+import os
+import json
+import array
+import heapq
+import struct
+import bisect
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .pool import ClubhousePool
+from .paging import iter_pages
+
+class VisitedSet:
+    """
+    VisitedSet Class
+
+    Set of user ids taking about 8 bytes per id: a sorted array of int64,
+    plus a small set of recent ids merged into the array once it grows.
+    """
+
+    def __init__(self, ids=()):
+        """ (VisitedSet, iterable of int) -> NoneType """
+        self._ids = array.array("q", sorted(set(ids)))
+        self._recent = set()
+
+    def __len__(self):
+        return len(self._ids) + len(self._recent)
+
+    def __contains__(self, user_id):
+        if user_id in self._recent:
+            return True
+        ids = self._ids
+        i = bisect.bisect_left(ids, user_id)
+        return i < len(ids) and ids[i] == user_id
+
+    def __iter__(self):
+        self.merge()
+        return iter(self._ids)
+
+    def add(self, user_id):
+        """ (VisitedSet, int) -> bool
+
+        Add a user id. Returns False if it was already there.
+        """
+        if user_id in self:
+            return False
+        self._recent.add(user_id)
+        if len(self._recent) > max(4096, len(self._ids) >> 4):
+            self.merge()
+        return True
+
+    def merge(self):
+        """ (VisitedSet) -> NoneType
+
+        Move the recent ids into the sorted array.
+        """
+        if self._recent:
+            self._ids = array.array("q", heapq.merge(self._ids, sorted(self._recent)))
+            self._recent = set()
+
+    def tobytes(self):
+        """ (VisitedSet) -> bytes """
+        self.merge()
+        return self._ids.tobytes()
+
+    @classmethod
+    def frombytes(cls, data):
+        """ (type, bytes) -> VisitedSet """
+        visited = cls()
+        visited._ids.frombytes(data)
+        return visited
+
+class Crawler:
+    """
+    Crawler Class
+
+    Expands users from a frontier queue: each expanded user's `relations`
+    ("following", "followers") are fetched, and the users
+    found are queued one level deeper. Users up to `max_depth` hops away
+    from the seeds are found, and the ones at `max_depth` are not expanded.
+    Expansion stops after `budget` users if given.
+
+    The frontier is breadth first by default. `priority(user, depth)`, if
+    given, returns a number instead (lowest expanded first), e.g.
+    `lambda user, depth: depth - 1 / (1 + len(user["bio"] or ""))`; seeds have no user.
+
+    `client` is a Clubhouse or a ClubhousePool. With a pool, `workers` users
+    are expanded at once and their pages are spread across accounts.
+
+    With `checkpoint`, the state of the crawl is written to that file every
+    `checkpoint_every` expanded users, and when the crawl stops. If the file
+    exists, the crawl resumes from it instead of starting from the seeds.
+    Users being expanded when the crawl was killed are expanded again,
+    so their edges may be reported twice.
+
+    A user whose expansion fails, by an exception or by a page answered with
+    an error (PageError), is put back into the frontier, up to
+    `max_retries` times. It is then kept in `failed` as (user_id, depth),
+    checkpoint included, and retry_failed() puts those back into the frontier.
+
+    >>> crawler = Crawler(pool, [user_id], relations=("following",), max_depth=2,
+    ...                   budget=10000, workers=8, checkpoint="crawl.ckpt")
+    >>> with Exporter("graph") as exporter:
+    ...     crawler.run(on_user=lambda user, depth: exporter.add_user(user), on_edge=exporter.add_edge)
+    """
+
+    # get_mutual_follows is relative to the calling account, so it gives no edge of the graph.
+    RELATIONS = ("following", "followers")
+    CHECKPOINT_MAGIC = b"CHCK"
+
+    def __init__(self, client, seeds=(), relations=("following",), max_depth=2, budget=None,
+                 priority=None, workers=1, page_size=50, checkpoint=None, checkpoint_every=100, max_retries=3):
+        """ (Crawler, Clubhouse, list of int, tuple of str, int, int, callable, int, int, str, int, int) -> NoneType """
+        for relation in relations:
+            if relation not in self.RELATIONS:
+                raise ValueError(f"Unknown relation: {relation}")
+        self.client = client
+        self.relations = tuple(relations)
+        self.max_depth = max_depth
+        self.budget = budget
+        self.priority = priority
+        self.workers = workers
+        self.page_size = page_size
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.max_retries = max_retries
+        self.expanded = 0
+        self.errors = 0
+        self.failed = []
+        self._retries = {}
+        self._frontier = []
+        self._seq = 0
+        self._stopped = threading.Event()
+        if checkpoint and os.path.exists(checkpoint):
+            self._load(checkpoint)
+        else:
+            self.visited = VisitedSet()
+            for user_id in seeds:
+                if self.visited.add(int(user_id)):
+                    self._push(int(user_id), 0, None)
+
+    def __len__(self):
+        """ Number of users left in the frontier. """
+        return len(self._frontier)
+
+    def _push(self, user_id, depth, user):
+        key = depth if self.priority is None else self.priority(user, depth)
+        self._seq += 1
+        heapq.heappush(self._frontier, (key, self._seq, user_id, depth))
+
+    def _requeue(self, entry):
+        """ Put a user back into the frontier, after the users of the same priority. """
+        self._seq += 1
+        heapq.heappush(self._frontier, (entry[0], self._seq, entry[2], entry[3]))
+
+    def retry_failed(self):
+        """ (Crawler) -> int
+
+        Put the users whose expansion failed back into the frontier.
+        Returns their number.
+        """
+        failed, self.failed = self.failed, []
+        for user_id, depth in failed:
+            self._retries.pop(user_id, None)
+            self._requeue((depth if self.priority is None else self.priority(None, depth), 0, user_id, depth))
+        return len(failed)
+
+    def _call(self, method, *args, **kwargs):
+        if isinstance(self.client, ClubhousePool):
+            return self.client.call(method, *args, **kwargs)
+        return getattr(self.client, method)(*args, **kwargs)
+
+    def _expand(self, user_id):
+        """ (Crawler, int) -> dict
+
+        Fetch every relation of a user, as relation -> list of users.
+        Raises PageError if any page is answered with an error, so that the
+        user is retried instead of being expanded with missing neighbours.
+        """
+        neighbours = {}
+        for relation in self.relations:
+            fetch = functools.partial(self._call, "get_" + relation, user_id, page_size=self.page_size)
+            neighbours[relation] = list(iter_pages(fetch, "users", self.page_size))
+        return neighbours
+
+    def stop(self):
+        """ (Crawler) -> NoneType
+
+        Stop the crawl once the users being expanded are done. It can be resumed from its checkpoint.
+        """
+        self._stopped.set()
+
+    def run(self, on_user=None, on_edge=None):
+        """ (Crawler, callable, callable) -> dict
+
+        Crawl until the frontier is empty, the budget is spent or stop() is called.
+        `on_user(user, depth)` is called once for every newly found user, and
+        `on_edge(source, target)` for every edge found, source following target.
+        Returns the crawl statistics.
+        """
+        self._stopped.clear()
+        in_flight = {}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            while True:
+                while (self._frontier and len(in_flight) < self.workers and not self._stopped.is_set()
+                       and (self.budget is None or self.expanded + len(in_flight) < self.budget)):
+                    entry = heapq.heappop(self._frontier)
+                    in_flight[executor.submit(self._expand, entry[2])] = entry
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry = in_flight.pop(future)
+                    try:
+                        neighbours = future.result()
+                    except Exception:
+                        self.errors += 1
+                        self._failed(entry)
+                        continue
+                    self._retries.pop(entry[2], None)
+                    self._process(entry, neighbours, on_user, on_edge)
+                    self.expanded += 1
+                    if self.checkpoint and self.expanded % self.checkpoint_every == 0:
+                        self.save(self.checkpoint, in_flight.values())
+        finally:
+            executor.shutdown(wait=False)
+            if self.checkpoint:
+                self.save(self.checkpoint, in_flight.values())
+        return self.stats()
+
+    def _failed(self, entry):
+        """ Retry a user whose expansion failed, or give up on it. """
+        user_id = entry[2]
+        retries = self._retries.get(user_id, 0)
+        if retries < self.max_retries:
+            self._retries[user_id] = retries + 1
+            self._requeue(entry)
+        else:
+            self._retries.pop(user_id, None)
+            self.failed.append((user_id, entry[3]))
+
+    def _process(self, entry, neighbours, on_user, on_edge):
+        _, _, user_id, depth = entry
+        for relation, users in neighbours.items():
+            for user in users:
+                other = user['user_id']
+                if on_edge is not None:
+                    if relation == "following":
+                        on_edge(user_id, other)
+                    else:
+                        on_edge(other, user_id)
+                if self.visited.add(other):
+                    if on_user is not None:
+                        on_user(user, depth + 1)
+                    if depth + 1 < self.max_depth:
+                        self._push(other, depth + 1, user)
+
+    def stats(self):
+        """ (Crawler) -> dict """
+        return {
+            "expanded": self.expanded,
+            "visited": len(self.visited),
+            "frontier": len(self._frontier),
+            "errors": self.errors,
+            "failed": len(self.failed),
+        }
+
+    def save(self, filename, in_flight=()):
+        """ (Crawler, str, iterable) -> NoneType
+
+        Write the state of the crawl to the given file, atomically.
+        Users in `in_flight` are put back into the frontier of the saved state.
+        """
+        state = json.dumps({
+            "frontier": self._frontier + sorted(in_flight),
+            "seq": self._seq,
+            "expanded": self.expanded,
+            "errors": self.errors,
+            "failed": self.failed,
+            "retries": list(self._retries.items()),
+        }).encode("utf-8")
+        visited = self.visited.tobytes()
+        temp = f"{filename}.tmp"
+        with open(temp, "wb") as file:
+            file.write(self.CHECKPOINT_MAGIC + struct.pack("<QQ", len(state), len(visited)))
+            file.write(state)
+            file.write(visited)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, filename)
+
+    def _load(self, filename):
+        with open(filename, "rb") as file:
+            magic, state_size, visited_size = struct.unpack("<4sQQ", file.read(20))
+            if magic != self.CHECKPOINT_MAGIC:
+                raise ValueError(f"Not a crawler checkpoint: {filename}")
+            state = json.loads(file.read(state_size))
+            self.visited = VisitedSet.frombytes(file.read(visited_size))
+        self._frontier = [tuple(x) for x in state["frontier"]]
+        heapq.heapify(self._frontier)
+        self._seq = state["seq"]
+        self.expanded = state["expanded"]
+        self.errors = state["errors"]
+        self.failed = [tuple(x) for x in state.get("failed", ())]
+        self._retries = dict(state.get("retries", ()))
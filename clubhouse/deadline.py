@@ -0,0 +1,53 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+deadline.py
+
+Deadlines spanning several API calls.
+
+>>> with deadline(10):
+...     clubhouse.join_channel(channel)
+...     clubhouse.get_channel(channel)
+...     clubhouse.active_ping(channel)
+
+Every call inside the block shortens its timeouts to the time left, and
+raises DeadlineExceeded once the budget is spent. Nested deadlines can only
+shorten the outer one. The deadline follows the current context, so it
+applies to the calls of the current thread or asyncio task.
+"""
+
+import time
+import contextlib
+import contextvars
+
+_DEADLINE = contextvars.ContextVar("clubhouse_deadline", default=None)
+
+class DeadlineExceeded(TimeoutError):
+    """ Raised when a call is made after the deadline of its block. """
+
+@contextlib.contextmanager
+def deadline(seconds):
+    """ (float) -> context manager
+
+    Run the calls of the block within the given number of seconds.
+    """
+    expires = time.monotonic() + seconds
+    current = _DEADLINE.get()
+    if current is not None:
+        expires = min(expires, current)
+    token = _DEADLINE.set(expires)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+def remaining():
+    """ () -> float
+
+    Seconds left before the current deadline, or None if there is none.
+    """
+    expires = _DEADLINE.get()
+    if expires is None:
+        return None
+    return expires - time.monotonic()
@@ -0,0 +1,1265 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+endpoints.py
+
+Declarative table of the API endpoints. Each Endpoint describes one method
+of Clubhouse: its HTTP verb and path, its parameters and how they are
+serialized, whether it requires authentication, and how the client may
+retry, coalesce and cache it. install_endpoints() generates the methods
+from this table, and the client derives its endpoint tables from it.
+
+GET parameters are sent in the query string, in order, and POST parameters
+as a JSON body. Endpoints that need more than that, like file uploads or
+argument checks, are written by hand in Clubhouse and only declared here.
+
+Paths are the ones the methods have always sent requests to, even where
+they differ from the method name.
+"""
+
+import inspect
+from collections import namedtuple
+
+REQUIRED = inspect.Parameter.empty
+
+class Param(namedtuple("Param", ("name", "default", "convert", "key"))):
+    """
+    Param Class
+
+    Parameter of an endpoint method. `default` is REQUIRED for positional
+    parameters without a default value. `convert` is applied to the value
+    before sending it, and `key` is its name in the request if it differs.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, name, default=REQUIRED, convert=None, key=None):
+        """ (type, str, object, callable, str) -> Param """
+        return super().__new__(cls, name, default, convert, key or name)
+
+def optional_int(value):
+    """ (object) -> int
+
+    Convert a value to int, or to None if it is empty.
+    """
+    return int(value) if value else None
+
+def bool_str(value):
+    """ (bool) -> str """
+    return "true" if value else "false"
+
+class Endpoint:
+    """
+    Endpoint Class
+
+    One API endpoint and the Clubhouse method calling it.
+
+    `auth` is "required" for endpoints that need a logged in account,
+    "anonymous" for the ones that must be called before logging in,
+    and None for the ones that can be called either way.
+    Endpoints that are not `idempotent` are not retried once sent, `read`
+    endpoints have no side effects and identical concurrent calls to them
+    can share a request, and responses of endpoints with a `cache_ttl` are
+    cached for that many seconds when the client has a cache. `invalidates`
+    lists the cached responses dropped by a call, as (endpoint, parameter).
+    `constants` are sent along with the parameters of POST endpoints;
+    give {} to send an empty JSON body.
+    """
+
+    __slots__ = ("name", "method", "path", "params", "auth", "unstable", "idempotent", "read",
+                 "cache_ttl", "invalidates", "constants", "doc", "_index", "_defaults", "_keys", "_query", "_converters")
+
+    def __init__(self, name, method, path=None, params=(), auth="required", unstable=False, idempotent=True,
+                 read=False, cache_ttl=None, invalidates=(), constants=None, doc=None):
+        """ (Endpoint, str, str, str, tuple of Param, str, bool, bool, bool, float, tuple, dict, str) -> NoneType """
+        self.name = name
+        self.method = method
+        self.path = path or name
+        self.params = tuple(params)
+        self.auth = auth
+        self.unstable = unstable
+        self.idempotent = idempotent
+        self.read = read
+        self.cache_ttl = cache_ttl
+        self.invalidates = tuple(invalidates)
+        self.constants = constants
+        self.doc = doc
+        # Precomputed serialization of the parameters.
+        self._index = {param.name: i for i, param in enumerate(self.params)}
+        self._defaults = tuple(param.default for param in self.params)
+        self._keys = tuple(param.key for param in self.params)
+        self._query = "&".join(f"{key}={{}}" for key in self._keys) if method == "GET" else None
+        self._converters = tuple((i, param.convert) for i, param in enumerate(self.params) if param.convert)
+
+    def __repr__(self):
+        return f"Endpoint({self.name!r}, {self.method!r}, path={self.path!r})"
+
+    def signature(self):
+        """ (Endpoint) -> inspect.Signature
+
+        Get the signature of the generated method.
+        """
+        parameters = [inspect.Parameter("self", inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+        for param in self.params:
+            parameters.append(inspect.Parameter(param.name, inspect.Parameter.POSITIONAL_OR_KEYWORD, default=param.default))
+        return inspect.Signature(parameters)
+
+    def bind(self, args, kwargs):
+        """ (Endpoint, tuple, dict) -> list
+
+        Get the values of the parameters of a call, like Python binds arguments.
+        """
+        params = self.params
+        if len(args) > len(params):
+            raise TypeError(f"{self.name}() takes {len(params) + 1} positional arguments but {len(args) + 1} were given")
+        values = list(args + self._defaults[len(args):])
+        for key, value in kwargs.items():
+            i = self._index.get(key)
+            if i is None:
+                raise TypeError(f"{self.name}() got an unexpected keyword argument '{key}'")
+            if i < len(args):
+                raise TypeError(f"{self.name}() got multiple values for argument '{key}'")
+            values[i] = value
+        if REQUIRED in values:
+            missing = [param.name for param, value in zip(params, values) if value is REQUIRED]
+            raise TypeError(f"{self.name}() missing required arguments: {', '.join(missing)}")
+        return values
+
+    def serialize(self, values):
+        """ (Endpoint, list) -> (str, dict)
+
+        Get the query string and the JSON body of a call. Converts the values in place.
+        """
+        for i, convert in self._converters:
+            values[i] = convert(values[i])
+        if self._query is not None:
+            return (self._query.format(*values) if values else None), None
+        if not values and self.constants is None:
+            return None, None
+        data = dict(zip(self._keys, values))
+        if self.constants:
+            data.update(self.constants)
+        return None, data
+
+def _generate(endpoint):
+    """ (Endpoint) -> function
+
+    Generate the method calling the given endpoint.
+    """
+    bind = endpoint.bind
+    serialize = endpoint.serialize
+    method, path = endpoint.method, endpoint.path
+    anonymous = endpoint.auth == "anonymous"
+
+    def call(self, *args, **kwargs):
+        if anonymous and self.HEADERS.get("Authorization"):
+            raise Exception('Already Authenticatied')
+        query, data = serialize(bind(args, kwargs))
+        return self._request(method, path, query=query, data=data)
+
+    call.__name__ = endpoint.name
+    call.__doc__ = endpoint.doc
+    call.__signature__ = endpoint.signature()
+    return call
+
+def install_endpoints(cls):
+    """ (type) -> type
+
+    Add a method to the given client class for every endpoint it does not define itself,
+    wrapped in its require_authentication and unstable_endpoint decorators.
+    """
+    for endpoint in ENDPOINTS.values():
+        if endpoint.name in cls.__dict__:
+            continue
+        func = _generate(endpoint)
+        func.__module__ = cls.__module__
+        func.__qualname__ = f"{cls.__name__}.{endpoint.name}"
+        if endpoint.auth == "required":
+            func = cls.require_authentication(func)
+        if endpoint.unstable:
+            func = cls.unstable_endpoint(func)
+        setattr(cls, endpoint.name, func)
+    return cls
+
+ENDPOINTS = (
+    Endpoint(
+        "start_phone_number_auth", "POST",
+        params=(Param("phone_number"),),
+        auth="anonymous",
+        idempotent=False,
+        doc=""" (Clubhouse, str) -> dict
+
+        Begin phone number authentication.
+        Some examples for the phone number.
+
+        >>> clubhouse = Clubhouse()
+        >>> clubhouse.start_phone_number_auth("+821012341337")
+        ...
+        >>> clubhouse.start_phone_number_auth("+818013371221")
+        ...
+        """,
+    ),
+    Endpoint(
+        "call_phone_number_auth", "POST",
+        params=(Param("phone_number"),),
+        auth="anonymous",
+        unstable=True,
+        idempotent=False,
+        doc=""" (Clubhouse, str) -> dict
+
+        Call the person and send verification message.
+        """,
+    ),
+    Endpoint(
+        "resend_phone_number_auth", "POST",
+        params=(Param("phone_number"),),
+        auth="anonymous",
+        unstable=True,
+        idempotent=False,
+        doc=""" (Clubhouse, str) -> dict
+
+        Resend the verification message
+        """,
+    ),
+    Endpoint(
+        "complete_phone_number_auth", "POST",
+        params=(Param("phone_number"), Param("verification_code")),
+        auth="anonymous",
+        idempotent=False,
+        doc=""" (Clubhouse, str, str) -> dict
+
+        Complete phone number authentication.
+        This should return `auth_token`, `access_token`, `refresh_token`, is_waitlisted, ...
+        Please note that output may be different depending on the status of the authenticated user
+        """,
+    ),
+    Endpoint(
+        "check_for_update", "GET",
+        params=(Param("is_testflight", False, convert=int),),
+        auth=None,
+        read=True,
+        doc=""" (Clubhouse, bool) -> dict
+
+        Check for app updates.
+
+        >>> clubhouse = Clubhouse()
+        >>> clubhouse.check_for_update(False)
+        {'has_update': False, 'success': True}
+        """,
+    ),
+    Endpoint(
+        "get_release_notes", "POST",
+        read=True,
+        cache_ttl=3600,
+        doc=""" (Clubhouse) -> dict
+
+        Get release notes.
+        """,
+    ),
+    Endpoint(
+        "check_waitlist_status", "POST",
+        read=True,
+        doc=""" (Clubhouse) -> dict
+
+        Check whether you're still on a waitlist or not.
+        """,
+    ),
+    Endpoint(
+        "add_email", "POST",
+        params=(Param("email"),),
+        idempotent=False,
+        doc=""" (Clubhouse, str) -> dict
+
+        Request for email verification.
+        You only need to do this once.
+        """,
+    ),
+    # Uploads a file. See Clubhouse.update_photo()
+    Endpoint(
+        "update_photo", "POST",
+        invalidates=(("get_profile", "user_id"),),
+    ),
+    Endpoint(
+        "follow", "POST",
+        params=(
+            Param("user_id", convert=int),
+            Param("user_ids", None),
+            Param("source", 4),
+            Param("source_topic_id", None),
+        ),
+        idempotent=False,
+        invalidates=(("get_profile", "user_id"), ("get_followers", "user_id")),
+        doc=""" (Clubhouse, int, list, int, int) -> dict
+
+        Follow a user.
+        Different value for `source` may require different parameters to be set
+        """,
+    ),
+    Endpoint(
+        "unfollow", "POST",
+        params=(Param("user_id", convert=int),),
+        invalidates=(("get_profile", "user_id"), ("get_followers", "user_id")),
+        doc=""" (Clubhouse, int) -> dict
+
+        Unfollow a user.
+        """,
+    ),
+    Endpoint(
+        "block", "POST",
+        params=(Param("user_id", convert=int),),
+        invalidates=(("get_profile", "user_id"), ("get_followers", "user_id")),
+        doc=""" (Clubhouse, int) -> dict
+
+        Block a user.
+        """,
+    ),
+    Endpoint(
+        "unblock", "POST",
+        params=(Param("user_id", convert=int),),
+        invalidates=(("get_profile", "user_id"),),
+        doc=""" (Clubhouse, int) -> dict
+
+        Unfollow a user.
+        """,
+    ),
+    Endpoint(
+        "follow_multiple", "POST",
+        params=(
+            Param("user_ids"),
+            Param("user_id", None),
+            Param("source", 7),
+            Param("source_topic_id", None),
+        ),
+        idempotent=False,
+        doc=""" (Clubhouse, list, int, int, int) -> dict
+
+        Follow multiple users at once.
+        Different value for `source` may require different parameters to be set
+        """,
+    ),
+    Endpoint(
+        "follow_club", "POST",
+        params=(Param("club_id", convert=int), Param("source_topic_id", None)),
+        idempotent=False,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Follow a club
+        """,
+    ),
+    Endpoint(
+        "unfollow_club", "POST",
+        params=(Param("club_id", convert=int), Param("source_topic_id", None)),
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Unfollow a club
+        """,
+    ),
+    Endpoint(
+        "update_follow_notifications", "POST",
+        params=(Param("user_id", convert=int), Param("notification_type", 2, convert=int)),
+        invalidates=(("get_profile", "user_id"),),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Update notification frequency for the given user.
+        1 = Always notify, 2 = Sometimes, 3 = Never
+        """,
+    ),
+    Endpoint(
+        "get_suggested_follows_similar", "POST",
+        params=(Param("user_id", convert=int),),
+        read=True,
+        doc=""" (Clubhouse, int) -> dict
+
+        Get similar users based on the given user.
+        """,
+    ),
+    Endpoint(
+        "get_suggested_follows_friends_only", "POST",
+        params=(Param("club_id", None), Param("upload_contacts", True), Param("contacts", ())),
+        doc=""" (Clubhouse, int, int, list of dict) -> dict
+
+        Get users based on the phone number.
+        Only seems to be used upon signup.
+        """,
+    ),
+    Endpoint(
+        "get_suggested_follows_all", "GET",
+        params=(Param("in_onboarding", True, convert=bool_str), Param("page_size", 50), Param("page", 1)),
+        read=True,
+        doc=""" (Clubhouse, bool, int, int) -> dict
+
+        Get all suggested follows.
+        """,
+    ),
+    Endpoint(
+        "ignore_suggested_follow", "POST", path="user_id",
+        params=(Param("user_id", convert=int),),
+        doc=""" (Clubhouse, str) -> dict
+
+        Remove user_id from the suggested follow list.
+        """,
+    ),
+    Endpoint(
+        "get_event", "POST",
+        params=(
+            Param("event_id", None, convert=optional_int),
+            Param("user_ids", None),
+            Param("club_id", None),
+            Param("is_member_only", False),
+            Param("event_hashid", None),
+            Param("description", None),
+            Param("time_start_epoch", None),
+            Param("name", None),
+        ),
+        read=True,
+        doc=""" (Clubhouse, int, list, int, bool, int, str, int, str) -> dict
+
+        Get details about the event
+        """,
+    ),
+    Endpoint(
+        "create_event", "POST", path="edit_event",
+        params=(
+            Param("name"),
+            Param("time_start_epoch"),
+            Param("description"),
+            Param("event_id", None, convert=optional_int),
+            Param("user_ids", ()),
+            Param("club_id", None),
+            Param("is_member_only", False),
+            Param("event_hashid", None),
+        ),
+        idempotent=False,
+        doc=""" (Clubhouse, str, int, str, int, list, int, bool, int) -> dict
+
+        Create a new event
+        """,
+    ),
+    Endpoint(
+        "edit_event", "POST",
+        params=(
+            Param("name"),
+            Param("time_start_epoch"),
+            Param("description"),
+            Param("event_id", None, convert=optional_int),
+            Param("user_ids", ()),
+            Param("club_id", None),
+            Param("is_member_only", False),
+            Param("event_hashid", None),
+        ),
+        idempotent=False,
+        doc=""" (Clubhouse, str, int, str, int, list, int, bool, int) -> dict
+
+        Edit an event.
+        """,
+    ),
+    Endpoint(
+        "delete_event", "POST",
+        params=(
+            Param("event_id", convert=optional_int),
+            Param("user_ids", None),
+            Param("club_id", None),
+            Param("is_member_only", False),
+            Param("event_hashid", None),
+            Param("description", None),
+            Param("time_start_epoch", None),
+            Param("name", None),
+        ),
+        doc=""" (Clubhouse, str, list, int, bool, int, str, int, str) -> dict
+
+        Delete event.
+        """,
+    ),
+    Endpoint(
+        "get_events", "GET",
+        params=(Param("is_filtered", True, convert=bool_str), Param("page_size", 25), Param("page", 1)),
+        read=True,
+        doc=""" (Clubhouse, bool, int, int) -> dict
+
+        Get list of upcoming events with details.
+        """,
+    ),
+    Endpoint(
+        "get_club", "POST",
+        params=(Param("club_id", convert=int), Param("source_topic_id", None)),
+        read=True,
+        cache_ttl=600,
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Get the information about the given club_id.
+        """,
+    ),
+    Endpoint(
+        "get_club_members", "GET",
+        params=(
+            Param("club_id"),
+            Param("return_followers", False, convert=int),
+            Param("return_members", True, convert=int),
+            Param("page_size", 50),
+            Param("page", 1),
+        ),
+        read=True,
+        doc=""" (Clubhouse, int, bool, bool, int, int) -> dict
+
+        Get list of members on the given club_id.
+        """,
+    ),
+    Endpoint(
+        "get_settings", "GET",
+        read=True,
+        cache_ttl=300,
+        doc=""" (Clubhouse) -> dict
+
+        Receive user's settings.
+        """,
+    ),
+    Endpoint(
+        "get_welcome_channel", "GET",
+        read=True,
+        doc=""" (Clubhouse) -> dict
+
+        Seems to be called upon sign up. Does not seem to return much data.
+        """,
+    ),
+    Endpoint(
+        "hide_channel", "POST",
+        params=(Param("channel"), Param("hide", True)),
+        doc=""" (Clubhouse, str, bool) -> dict
+
+        Hide/unhide the channel from the channel list.
+        """,
+    ),
+    Endpoint(
+        "join_channel", "POST",
+        params=(
+            Param("channel"),
+            Param("attribution_source", "feed"),
+            Param("attribution_details", "eyJpc19leHBsb3JlIjpmYWxzZSwicmFuayI6MX0="),
+        ),
+        doc=""" (Clubhouse, str, str) -> dict
+
+        Join the given channel
+        """,
+    ),
+    Endpoint(
+        "leave_channel", "POST",
+        params=(Param("channel"),),
+        constants={"channel_id": None},
+        doc=""" (Clubhouse, str) -> dict
+
+        Leave the given channel
+        """,
+    ),
+    Endpoint(
+        "make_channel_public", "POST",
+        params=(Param("channel"), Param("channel_id", None)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Make the current channel open to public.
+        Everyone can join the channel.
+        """,
+    ),
+    Endpoint(
+        "make_channel_social", "POST",
+        params=(Param("channel"), Param("channel_id", None)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Make the current channel open to public.
+        Only people who user follows can join the channel.
+        """,
+    ),
+    Endpoint(
+        "end_channel", "POST",
+        params=(Param("channel"), Param("channel_id", None)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Kick everyone and close the channel. Requires moderator privilege.
+        """,
+    ),
+    Endpoint(
+        "make_moderator", "POST",
+        params=(Param("channel"), Param("user_id", convert=int)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Make the given user moderator. Requires moderator privilege.
+        """,
+    ),
+    Endpoint(
+        "block_from_channel", "POST",
+        params=(Param("channel"), Param("user_id", convert=int)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Remove the user from the channel. The user will not be able to re-join.
+        """,
+    ),
+    Endpoint(
+        "get_profile", "POST",
+        params=(Param("user_id", convert=int),),
+        read=True,
+        cache_ttl=300,
+        doc=""" (Clubhouse, str) -> dict
+
+        Lookup someone else's profile. It is OK to one's own profile with this method.
+        """,
+    ),
+    Endpoint(
+        "me", "POST",
+        params=(
+            Param("return_blocked_ids", False),
+            Param("timezone_identifier", "Asia/Tokyo"),
+            Param("return_following_ids", False),
+        ),
+        read=True,
+        doc=""" (Clubhouse, bool, str, bool) -> dict
+
+        Get my information
+        """,
+    ),
+    Endpoint(
+        "get_following", "GET",
+        params=(Param("user_id"), Param("page_size", 50), Param("page", 1)),
+        read=True,
+        doc=""" (Clubhouse, str, int, int) -> dict
+
+        Get following users type2
+        """,
+    ),
+    Endpoint(
+        "get_followers", "GET",
+        params=(Param("user_id"), Param("page_size", 50), Param("page", 1)),
+        read=True,
+        doc=""" (Clubhouse, str, int, int) -> dict
+
+        Get followers of the given user_id.
+        """,
+    ),
+    Endpoint(
+        "get_mutual_follows", "GET",
+        params=(Param("user_id"), Param("page_size", 50), Param("page", 1)),
+        read=True,
+        doc=""" (Clubhouse, str, int, int) -> dict
+
+        Get mutual followers between the current user and the given user_id.
+        """,
+    ),
+    Endpoint(
+        "get_all_topics", "GET",
+        read=True,
+        cache_ttl=3600,
+        doc=""" (Clubhouse) -> dict
+
+        Get list of topics, based on the server's channel selection algorithm
+        """,
+    ),
+    Endpoint(
+        "get_channels", "GET",
+        read=True,
+        doc=""" (Clubhouse) -> dict
+
+        Get list of channels, based on the server's channel selection algorithm
+        """,
+    ),
+    Endpoint(
+        "get_channel", "POST",
+        params=(Param("channel"), Param("channel_id", None)),
+        read=True,
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Get information of the given channel
+        """,
+    ),
+    Endpoint(
+        "active_ping", "POST",
+        params=(Param("channel"),),
+        constants={"chanel_id": None},
+        doc=""" (Clubhouse, str) -> dict
+
+        Keeping the user active while being in a chatroom
+        """,
+    ),
+    Endpoint(
+        "audience_reply", "POST",
+        params=(Param("channel"), Param("raise_hands", True), Param("unraise_hands", False)),
+        idempotent=False,
+        doc=""" (Clubhouse, str, bool, bool) -> bool
+
+        Request for raise_hands.
+        """,
+    ),
+    # Checks its arguments. See Clubhouse.change_handraise_settings()
+    Endpoint("change_handraise_settings", "POST"),
+    # Checks its arguments. See Clubhouse.update_skintone()
+    Endpoint(
+        "update_skintone", "POST",
+        invalidates=(("get_settings", None),),
+    ),
+    Endpoint(
+        "get_notifications", "GET",
+        params=(Param("page_size", 20), Param("page", 1)),
+        read=True,
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Get my notifications.
+        """,
+    ),
+    Endpoint(
+        "get_actionable_notifications", "GET",
+        read=True,
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Get notifications. This may return some notifications that require some actions
+        """,
+    ),
+    Endpoint(
+        "get_online_friends", "POST",
+        constants={},
+        read=True,
+        doc=""" (Clubhouse) -> dict
+
+        List all online friends.
+        """,
+    ),
+    Endpoint(
+        "accept_speaker_invite", "POST",
+        params=(Param("channel"), Param("user_id", convert=int)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Accept speaker's invitation, based on the (channel, invited_moderator)
+        `raise_hands` needs to be called first, prior to the invitation.
+        """,
+    ),
+    Endpoint(
+        "reject_speaker_invite", "POST",
+        params=(Param("channel"), Param("user_id", convert=int)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Reject speaker's invitation.
+        """,
+    ),
+    Endpoint(
+        "invite_speaker", "POST",
+        params=(Param("channel"), Param("user_id", convert=int)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Move audience to speaker. Requires moderator privilege.
+        """,
+    ),
+    Endpoint(
+        "uninvite_speaker", "POST",
+        params=(Param("channel"), Param("user_id", convert=int)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Move speaker to audience. Requires moderator privilege.
+        """,
+    ),
+    Endpoint(
+        "mute_speaker", "POST",
+        params=(Param("channel"), Param("user_id", convert=int)),
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Mute speaker. Requires moderator privilege
+        """,
+    ),
+    Endpoint(
+        "get_suggested_speakers", "POST",
+        params=(Param("channel"),),
+        read=True,
+        doc=""" (Clubhouse, str) -> dict
+
+        Get suggested speakers from the given channel
+        """,
+    ),
+    Endpoint(
+        "create_channel", "POST",
+        params=(
+            Param("topic", ""),
+            Param("user_ids", ()),
+            Param("is_private", False),
+            Param("is_social_mode", False),
+        ),
+        constants={"club_id": None, "event_id": None},
+        idempotent=False,
+        doc=""" (Clubhouse, str, list, bool, bool) -> dict
+
+        Create a new channel. Type of the room can be changed
+        """,
+    ),
+    Endpoint(
+        "get_create_channel_targets", "POST",
+        constants={},
+        read=True,
+        doc=""" (Clubhouse) -> dict
+
+        Not sure what this does. Triggered upon channel creation
+        """,
+    ),
+    Endpoint(
+        "get_suggested_invites", "POST",
+        params=(Param("club_id", None), Param("upload_contacts", True), Param("contacts", ())),
+        doc=""" (Clubhouse, int, bool, list of dict) -> dict
+
+        Get invitations and user lists based on phone number.
+
+        contacts(dict)
+            - example: [{"name": "Test Name", "phone_number": "+821043219876"}, ...]
+        """,
+    ),
+    Endpoint(
+        "get_suggested_club_invites", "POST",
+        params=(Param("upload_contacts", True), Param("contacts", ())),
+        doc=""" (Clubhouse, int, bool, list of dict) -> dict
+
+        Get user lists based on phone number. For inviting clubs.
+
+        contacts(dict)
+            - example: [{"name": "Test Name", "phone_number": "+821043219876"}, ...]
+        """,
+    ),
+    Endpoint(
+        "invite_to_app", "POST",
+        params=(Param("name"), Param("phone_number"), Param("message", None)),
+        idempotent=False,
+        doc=""" (Clubhouse, str, str, str) -> dict
+
+        Invite users to app. but this only works when you have a leftover invitation.
+        """,
+    ),
+    Endpoint(
+        "invite_from_waitlist", "POST",
+        params=(Param("user_id", convert=int),),
+        idempotent=False,
+        doc=""" (Clubhouse, str, str, str) -> dict
+
+        Invite someone from the waitlist.
+        This is much more reliable than inviting someone by invite_to_app
+        """,
+    ),
+    Endpoint(
+        "search_users", "POST",
+        params=(
+            Param("query"),
+            Param("followers_only", False),
+            Param("following_only", False),
+            Param("cofollows_only", False),
+        ),
+        read=True,
+        doc=""" (Clubhouse, str, bool, bool, bool) -> dict
+
+        Search users based on the given query.
+        """,
+    ),
+    Endpoint(
+        "search_clubs", "POST",
+        params=(
+            Param("query"),
+            Param("followers_only", False),
+            Param("following_only", False),
+            Param("cofollows_only", False),
+        ),
+        read=True,
+        doc=""" (Clubhouse, str, bool, bool, bool) -> dict
+
+        Search clubs based on the given query.
+        """,
+    ),
+    Endpoint(
+        "get_topic", "POST",
+        params=(Param("topic_id", convert=int),),
+        read=True,
+        cache_ttl=3600,
+        doc=""" (Clubhouse, int) -> dict
+
+        Get topic's information based on the given topic id.
+        """,
+    ),
+    Endpoint(
+        "get_clubs_for_topic", "GET",
+        params=(Param("topic_id"), Param("page_size", 25), Param("page", 1)),
+        read=True,
+        doc=""" (Clubhouse, int, int, int) -> dict
+
+        Get list of clubs based on the given topic id.
+        """,
+    ),
+    Endpoint(
+        "get_clubs", "POST",
+        params=(Param("is_startable_only"),),
+        read=True,
+        doc=""" (Clubhouse, bool) -> dict
+
+        Get list of clubs the user's in.
+        """,
+    ),
+    Endpoint(
+        "get_users_for_topic", "GET",
+        params=(Param("topic_id"), Param("page_size", 25), Param("page", 1)),
+        read=True,
+        doc=""" (Clubhouse, int, int, int) -> dict
+
+        Get list of users based on the given topic id.
+        """,
+    ),
+    Endpoint(
+        "invite_to_existing_channel", "POST",
+        params=(Param("channel"), Param("user_id", convert=int)),
+        idempotent=False,
+        doc=""" (Clubhouse, str, int) -> dict
+
+        Invite someone to a currently joined channel.
+        It will send a ping notification to the given user_id.
+        """,
+    ),
+    Endpoint(
+        "update_username", "POST",
+        params=(Param("username"),),
+        idempotent=False,
+        invalidates=(("get_profile", "user_id"),),
+        doc=""" (Clubhouse, str) -> dict
+
+        Change username. YOU HAVE LIMITED NUMBER OF TRIALS TO CHANGE YOUR USERNAME.
+        """,
+    ),
+    Endpoint(
+        "update_name", "POST",
+        params=(Param("name"),),
+        idempotent=False,
+        invalidates=(("get_profile", "user_id"),),
+        doc=""" (Clubhouse, str) -> dict
+
+        Change your legal name. Be careful of what you're trying to enter.
+            (1) Upon registration
+            (2) Changing your legal name. YOU CAN ONLY DO THIS ONCE.
+        """,
+    ),
+    Endpoint(
+        "update_twitter_username", "POST",
+        params=(Param("username"), Param("twitter_token"), Param("twitter_secret")),
+        unstable=True,
+        invalidates=(("get_profile", "user_id"),),
+        doc=""" (Clubhouse, str, str, str) -> dict
+
+        Change Twitter username based on Twitter Token.
+
+        >>> client.update_twitter_username(None, None, None) # Clear username
+        >>> client.update_twitter_username("stereotype32", "...", "...") # Set username
+        """,
+    ),
+    Endpoint(
+        "update_instagram_username", "POST",
+        params=(Param("code"),),
+        unstable=True,
+        invalidates=(("get_profile", "user_id"),),
+        doc=""" (Clubhouse, str) -> dict
+
+        Change Twitter username based on Instagram token.
+
+        >>> client.update_instagram_username(None) # Clear username
+        >>> client.update_instagram_username("...") # Set username
+        """,
+    ),
+    Endpoint(
+        "update_displayname", "POST", path="update_name",
+        params=(Param("name"),),
+        idempotent=False,
+        invalidates=(("get_profile", "user_id"),),
+        doc=""" (Clubhouse, str) -> dict
+
+        Change your nickname. YOU CAN ONLY DO THIS ONCE.
+        """,
+    ),
+    Endpoint(
+        "refresh_token", "POST",
+        params=(Param("refresh_token", key="refresh"),),
+        idempotent=False,
+        doc=""" (Clubhouse, str) -> dict
+
+        Refresh the JWT token. returns both access and refresh token.
+        """,
+    ),
+    Endpoint(
+        "update_bio", "POST",
+        params=(Param("bio"),),
+        invalidates=(("get_profile", "user_id"),),
+        doc=""" (Clubhouse, str) -> dict
+
+        Update bio on your profile
+        """,
+    ),
+    Endpoint(
+        "record_action_trails", "POST", path="update_bio",
+        params=(Param("action_trails", ()),),
+        invalidates=(("get_profile", "user_id"),),
+        doc=""" (Clubhouse, list of dict) -> dict
+
+        Recording actions of the user interactions while using the app.
+        action_trails: [{"blob_data":{}, "trail_type": "...", ...}, ...]
+        """,
+    ),
+    Endpoint(
+        "add_user_topic", "POST",
+        params=(Param("club_id", None, convert=optional_int), Param("topic_id", None, convert=optional_int)),
+        invalidates=(("get_profile", "user_id"), ("get_club", "club_id"), ("get_topic", "topic_id")),
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Add user's interest.
+
+        Some interesting flags for Language has been shared in the following link.
+        Reference: https://github.com/grishka/Houseclub/issues/24
+        """,
+    ),
+    Endpoint(
+        "remove_user_topic", "POST",
+        params=(Param("club_id", None, convert=optional_int), Param("topic_id", None, convert=optional_int)),
+        invalidates=(("get_profile", "user_id"), ("get_club", "club_id"), ("get_topic", "topic_id")),
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Remove user's interest
+        """,
+    ),
+    Endpoint(
+        "report_incident", "POST",
+        params=(
+            Param("user_id", convert=int),
+            Param("channel"),
+            Param("incident_type"),
+            Param("incident_description"),
+            Param("email"),
+        ),
+        unstable=True,
+        idempotent=False,
+        doc=""" (Clubhouse, int, str, unknown, str, str) -> dict
+
+        Report incident
+        There seemed to be a field for attachment, need to trace this later
+        """,
+    ),
+    Endpoint(
+        "reject_welcome_channel", "GET",
+        unstable=True,
+        doc=""" (Clubhouse) -> dict
+
+        Unknown
+        """,
+    ),
+    Endpoint(
+        "update_channel_flags", "POST",
+        params=(Param("channel"), Param("visibility"), Param("flag_title"), Param("unflag_title")),
+        unstable=True,
+        doc=""" (Clubhouse, str, bool, unknown, unknown) -> dict
+
+        Unknown
+        """,
+    ),
+    Endpoint(
+        "ignore_actionable_notification", "POST",
+        params=(Param("actionable_notification_id"),),
+        unstable=True,
+        doc=""" (Clubhouse, int) -> dict
+
+        Ignore the actionable notification.
+        """,
+    ),
+    Endpoint(
+        "invite_to_new_channel", "POST",
+        params=(Param("user_id", convert=int), Param("channel")),
+        unstable=True,
+        idempotent=False,
+        doc=""" (Clubhouse, int, str) -> dict
+
+        Invite someone to the channel
+        """,
+    ),
+    Endpoint(
+        "accept_new_channel_invite", "POST",
+        params=(Param("channel_invite_id"),),
+        unstable=True,
+        doc=""" (Clubhouse, int) -> dict
+
+        Accept Channel Invitation
+        """,
+    ),
+    Endpoint(
+        "reject_new_channel_invite", "POST",
+        params=(Param("channel_invite_id"),),
+        unstable=True,
+        doc=""" (Clubhouse, int) -> dict
+
+        Reject Channel Invitation
+        """,
+    ),
+    Endpoint(
+        "cancel_new_channel_invite", "POST",
+        params=(Param("channel_invite_id"),),
+        unstable=True,
+        doc=""" (Clubhouse, int) -> dict
+
+        Cancel Channel Invitation
+        """,
+    ),
+    Endpoint(
+        "add_club_admin", "POST",
+        params=(Param("club_id", convert=int), Param("user_id", convert=int)),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Add Club Admin. Requires privilege.
+        """,
+    ),
+    Endpoint(
+        "remove_club_admin", "POST",
+        params=(Param("club_id", convert=optional_int), Param("user_id", convert=int)),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Remove Club admin. Requires privilege.
+        """,
+    ),
+    Endpoint(
+        "remove_club_member", "POST",
+        params=(Param("club_id", convert=optional_int), Param("user_id", convert=int)),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Remove Club member. Requires privilege.
+        """,
+    ),
+    Endpoint(
+        "accept_club_member_invite", "POST",
+        params=(Param("club_id", convert=optional_int), Param("source_topic_id", None)),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, int) -> dict
+
+        Accept Club member invite.
+        """,
+    ),
+    Endpoint(
+        "add_club_member", "POST",
+        params=(
+            Param("club_id", convert=int),
+            Param("user_id", convert=int),
+            Param("name"),
+            Param("phone_number"),
+            Param("message"),
+            Param("reason"),
+        ),
+        unstable=True,
+        idempotent=False,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, int, str, str, str, unknown) -> dict
+
+        Add club member
+        """,
+    ),
+    Endpoint(
+        "get_club_nominations", "POST",
+        params=(Param("club_id", convert=int), Param("source_topic_id")),
+        unstable=True,
+        read=True,
+        doc=""" (Club, int, int) -> dict
+
+        Get club nomination list
+        """,
+    ),
+    Endpoint(
+        "approve_club_nomination", "POST",
+        params=(Param("club_id", convert=int), Param("source_topic_id"), Param("invite_nomination_id")),
+        unstable=True,
+        doc=""" (Club, int, int) -> dict
+
+        Approve club nomination
+        """,
+    ),
+    Endpoint(
+        "reject_club_nomination", "POST", path="approve_club_nomination",
+        params=(Param("club_id", convert=int), Param("source_topic_id"), Param("invite_nomination_id")),
+        unstable=True,
+        doc=""" (Club, int, int) -> dict
+
+        Reject club nomination
+        """,
+    ),
+    Endpoint(
+        "add_club_topic", "POST",
+        params=(Param("club_id", convert=int), Param("topic_id", convert=int)),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Club, int, int) -> dict
+
+        Add club topic
+        """,
+    ),
+    Endpoint(
+        "remove_club_topic", "POST",
+        params=(Param("club_id", convert=int), Param("topic_id", convert=int)),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Club, int, int) -> dict
+
+        Remove club topic
+        """,
+    ),
+    Endpoint(
+        "get_events_to_start", "GET",
+        unstable=True,
+        read=True,
+        doc=""" (Clubhouse) -> dict
+
+        Get events to start
+        """,
+    ),
+    Endpoint(
+        "update_is_follow_allowed", "POST",
+        params=(Param("club_id", convert=int), Param("is_follow_allowed", True)),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, bool) -> dict
+
+        Update follow button of the given Club
+        """,
+    ),
+    Endpoint(
+        "update_is_membership_private", "POST",
+        params=(Param("club_id", convert=int), Param("is_membership_private")),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, bool) -> dict
+
+        Update membership status of the given Club
+        """,
+    ),
+    Endpoint(
+        "update_is_community", "POST",
+        params=(Param("club_id", convert=int), Param("is_community")),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, bool) -> dict
+
+        Update community stat of the given Club
+        """,
+    ),
+    Endpoint(
+        "update_club_description", "POST",
+        params=(Param("club_id", convert=int), Param("description")),
+        unstable=True,
+        invalidates=(("get_club", "club_id"),),
+        doc=""" (Clubhouse, int, str) -> dict
+
+        Update description of the given Club
+        """,
+    ),
+)
+ENDPOINTS = {endpoint.name: endpoint for endpoint in ENDPOINTS}
+
+# Endpoint tables of the client, by path.
+NON_IDEMPOTENT_ENDPOINTS = frozenset(x.path for x in ENDPOINTS.values() if not x.idempotent)
+READ_ENDPOINTS = frozenset(x.path for x in ENDPOINTS.values() if x.read)
+CACHE_TTLS = {x.path: x.cache_ttl for x in ENDPOINTS.values() if x.cache_ttl}
+CACHE_INVALIDATIONS = {x.path: x.invalidates for x in ENDPOINTS.values() if x.invalidates}
+PATHS = frozenset(x.path for x in ENDPOINTS.values())
@@ -0,0 +1,288 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+export.py
+
+Stream users and follower edges into compact columnar files, a chunk at
+a time, so that exporting a large follower graph does not keep the records
+in memory.
+
+Files are written as Parquet when pyarrow is installed (pip3 install clubhouse-py[export]),
+and in a packed binary format otherwise, readable back with read_packed().
+
+Packed format, little-endian:
+
+    b"CHX1", uint32 schema length, schema as JSON: [[column, "int64" or "string"], ...]
+    then chunks of: uint32 row count, then each column in order:
+        int64:  row count * int64
+        string: row count * int32 byte length (-1 for null), uint64 data length, utf-8 data
+"""
+
+import os
+import sys
+import json
+import array
+import struct
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+MAGIC = b"CHX1"
+
+USER_COLUMNS = (
+    ("user_id", "int64"),
+    ("username", "string"),
+    ("name", "string"),
+    ("photo_url", "string"),
+    ("bio", "string"),
+    ("twitter", "string"),
+    ("instagram", "string"),
+)
+
+# source follows target
+EDGE_COLUMNS = (
+    ("source", "int64"),
+    ("target", "int64"),
+)
+
+def _little_endian(values):
+    """ Get the bytes of an array, in little-endian order. """
+    if sys.byteorder == "big":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+class _PackedWriter:
+    """ Writes chunks of columns in the packed format. """
+
+    def __init__(self, filename, columns):
+        self._file = open(filename, "wb")
+        schema = json.dumps(columns).encode("utf-8")
+        self._file.write(MAGIC + struct.pack("<I", len(schema)) + schema)
+
+    def write(self, columns, chunk):
+        out = self._file
+        out.write(struct.pack("<I", len(chunk[0])))
+        for (_, kind), values in zip(columns, chunk):
+            if kind == "int64":
+                out.write(_little_endian(values))
+                continue
+            lengths = array.array("i")
+            data = []
+            for value in values:
+                if value is None:
+                    lengths.append(-1)
+                else:
+                    value = value.encode("utf-8")
+                    lengths.append(len(value))
+                    data.append(value)
+            data = b"".join(data)
+            out.write(_little_endian(lengths))
+            out.write(struct.pack("<Q", len(data)))
+            out.write(data)
+
+    def close(self):
+        self._file.close()
+
+class _ParquetWriter:
+    """ Writes chunks of columns as row groups of a Parquet file. """
+
+    def __init__(self, filename, columns):
+        self._schema = pyarrow.schema([(name, getattr(pyarrow, kind)()) for name, kind in columns])
+        self._writer = pyarrow.parquet.ParquetWriter(filename, self._schema, compression="zstd")
+
+    def write(self, columns, chunk):
+        arrays = [pyarrow.array(values, field.type) for values, field in zip(chunk, self._schema)]
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+class _Table:
+    """ Column buffers of one output file, flushed every `chunk_size` rows. """
+
+    def __init__(self, writer, columns, chunk_size):
+        self.writer = writer
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self._new_chunk()
+
+    def _new_chunk(self):
+        self._chunk = [array.array("q") if kind == "int64" else [] for _, kind in self.columns]
+
+    def append(self, row):
+        for column, value in zip(self._chunk, row):
+            column.append(value)
+        self.rows += 1
+        if len(self._chunk[0]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if len(self._chunk[0]):
+            self.writer.write(self.columns, self._chunk)
+            self._new_chunk()
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+class Exporter:
+    """
+    Exporter Class
+
+    Writes users to `users.<ext>` and follow edges to `edges.<ext>` in the
+    given directory. `format` is "parquet", "packed", or None to use Parquet
+    when pyarrow is installed. Rows are buffered as columns and written every
+    `chunk_size` rows.
+
+    Users may be dicts or User models. Users are not deduplicated.
+
+    >>> with Exporter("graph") as exporter:
+    ...     exporter.add_followers(user_id, clubhouse.iter_followers(user_id))
+    ...     exporter.add_following(user_id, clubhouse.iter_following(user_id))
+    """
+
+    EXTENSIONS = {"parquet": "parquet", "packed": "chx"}
+
+    def __init__(self, directory, format=None, chunk_size=65536):
+        """ (Exporter, str, str, int) -> NoneType """
+        if format is None:
+            format = "parquet" if pyarrow is not None else "packed"
+        if format not in self.EXTENSIONS:
+            raise ValueError(f"Unknown export format: {format}")
+        if format == "parquet" and pyarrow is None:
+            raise ImportError("Parquet export requires pyarrow. (pip3 install pyarrow)")
+        writer = _ParquetWriter if format == "parquet" else _PackedWriter
+        os.makedirs(directory, exist_ok=True)
+        self.format = format
+        self.users_file = os.path.join(directory, "users." + self.EXTENSIONS[format])
+        self.edges_file = os.path.join(directory, "edges." + self.EXTENSIONS[format])
+        self._users = _Table(writer(self.users_file, USER_COLUMNS), USER_COLUMNS, chunk_size)
+        self._edges = _Table(writer(self.edges_file, EDGE_COLUMNS), EDGE_COLUMNS, chunk_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def num_users(self):
+        """ (Exporter) -> int """
+        return self._users.rows
+
+    @property
+    def num_edges(self):
+        """ (Exporter) -> int """
+        return self._edges.rows
+
+    def add_user(self, user):
+        """ (Exporter, dict) -> NoneType
+
+        Export a user record.
+        """
+        get = user.get if isinstance(user, dict) else lambda x: getattr(user, x)
+        self._users.append([
+            int(get(name)) if kind == "int64" else get(name)
+            for name, kind in USER_COLUMNS
+        ])
+
+    def add_edge(self, source, target):
+        """ (Exporter, int, int) -> NoneType
+
+        Export the fact that user `source` follows user `target`.
+        """
+        self._edges.append((int(source), int(target)))
+
+    def add_followers(self, user_id, users):
+        """ (Exporter, int, iterable of dict) -> int
+
+        Export the followers of user_id and their edges, as they are iterated.
+        Returns the number of followers.
+        """
+        count = 0
+        for user in users:
+            self.add_user(user)
+            self.add_edge(_user_id(user), user_id)
+            count += 1
+        return count
+
+    def add_following(self, user_id, users):
+        """ (Exporter, int, iterable of dict) -> int
+
+        Export the users followed by user_id and their edges, as they are iterated.
+        Returns the number of users.
+        """
+        count = 0
+        for user in users:
+            self.add_user(user)
+            self.add_edge(user_id, _user_id(user))
+            count += 1
+        return count
+
+    def flush(self):
+        """ (Exporter) -> NoneType
+
+        Write the buffered rows.
+        """
+        self._users.flush()
+        self._edges.flush()
+
+    def close(self):
+        """ (Exporter) -> NoneType
+
+        Write the buffered rows and close the files.
+        """
+        self._users.close()
+        self._edges.close()
+
+def _user_id(user):
+    """ (dict) -> int """
+    return user["user_id"] if isinstance(user, dict) else user.user_id
+
+def _read_array(file, typecode, count):
+    values = array.array(typecode)
+    values.frombytes(file.read(values.itemsize * count))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+def read_packed(filename):
+    """ (str) -> generator of dict
+
+    Read back a file of the packed format, one chunk at a time,
+    as column name -> array of int64 or list of str.
+    """
+    with open(filename, "rb") as file:
+        magic, length = struct.unpack("<4sI", file.read(8))
+        if magic != MAGIC:
+            raise ValueError(f"Not a packed export file: {filename}")
+        columns = json.loads(file.read(length))
+        while True:
+            header = file.read(4)
+            if not header:
+                return
+            rows, = struct.unpack("<I", header)
+            chunk = {}
+            for name, kind in columns:
+                if kind == "int64":
+                    chunk[name] = _read_array(file, "q", rows)
+                    continue
+                lengths = _read_array(file, "i", rows)
+                size, = struct.unpack("<Q", file.read(8))
+                data = memoryview(file.read(size))
+                values = []
+                offset = 0
+                for length in lengths:
+                    if length < 0:
+                        values.append(None)
+                    else:
+                        values.append(str(data[offset:offset + length], "utf-8"))
+                        offset += length
+                chunk[name] = values
+            yield chunk
@@ -0,0 +1,190 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+keepalive.py
+
+Keep-alive pings for every channel a client sits in.
+The server drops listeners that do not call active_ping every 30 seconds or so.
+"""
+
+import time
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .scheduler import default_scheduler
+
+# Fraction of the interval between the first pings of consecutive channels.
+# Successive multiples of the golden ratio spread evenly over [0, 1).
+_PHASE_STEP = 0.6180339887498949
+
+class KeepAlive:
+    """
+    KeepAlive Class
+
+    Pings each joined channel every `interval` seconds on a shared Scheduler.
+    Channels are added by join_channel / create_channel and removed by
+    leave_channel / end_channel when the client is created with `keep_alive=True`,
+    or with add() and remove().
+
+    The first pings of the channels are spread over the interval, so that
+    a client in many channels does not send all of its pings at once.
+    Pings go through the client, so they share its pooled connections.
+    The scheduler only hands them over: pings of a Clubhouse are sent by
+    up to `max_workers` threads, and pings of an AsyncClubhouse on its
+    event loop, so that a slow channel does not delay the others.
+
+    A ping is missed when it fails, the server does not acknowledge it,
+    or it starts more than `interval` seconds after it was due.
+    `on_missed(channel, error)` is then called with the exception or the response.
+
+    >>> clubhouse = Clubhouse(user_id, user_token, user_device, keep_alive=True)
+    >>> clubhouse.keep_alive.on_missed = lambda channel, error: print("missed", channel, error)
+    >>> clubhouse.join_channel(channel)
+    """
+
+    JOIN_ENDPOINTS = ("join_channel", "create_channel")
+    LEAVE_ENDPOINTS = ("leave_channel", "end_channel")
+
+    def __init__(self, client, interval=30.0, scheduler=None, on_missed=None, max_workers=10):
+        """ (KeepAlive, Clubhouse, float, Scheduler, callable, int) -> NoneType """
+        self.client = client
+        self.interval = interval
+        self.scheduler = scheduler or default_scheduler()
+        self.on_missed = on_missed
+        self.max_workers = max_workers
+        self.stats = {}
+        self._jobs = {}
+        # Channels whose ping is queued or in flight.
+        self._pending = set()
+        self._executor = None
+        self._phase = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __contains__(self, channel):
+        return channel in self._jobs
+
+    @property
+    def channels(self):
+        """ (KeepAlive) -> list of str
+
+        Get the channels being pinged.
+        """
+        return list(self._jobs)
+
+    def add(self, channel):
+        """ (KeepAlive, str) -> NoneType
+
+        Start pinging the given channel.
+        Call it from the event loop of the client if the client is an AsyncClubhouse.
+        """
+        # A Clubhouse blocks, even when used from a running event loop: only ping on the loop for async clients.
+        loop = asyncio.get_running_loop() if inspect.iscoroutinefunction(self.client.active_ping) else None
+        with self._lock:
+            if channel in self._jobs:
+                return
+            self._phase = (self._phase + _PHASE_STEP) % 1
+            self.stats[channel] = {"pings": 0, "missed": 0, "consecutive_missed": 0, "last_ping": None}
+            self._jobs[channel] = self.scheduler.every(
+                self.interval, self._ping, channel, loop, delay=self.interval * self._phase
+            )
+
+    def remove(self, channel):
+        """ (KeepAlive, str) -> NoneType
+
+        Stop pinging the given channel.
+        """
+        with self._lock:
+            job = self._jobs.pop(channel, None)
+            self.stats.pop(channel, None)
+        if job is not None:
+            job.set()
+
+    def observe(self, endpoint, data, result):
+        """ (KeepAlive, str, dict, dict) -> NoneType
+
+        Track the joined channels from the calls made by the client.
+        """
+        if endpoint in self.JOIN_ENDPOINTS:
+            if isinstance(result, dict) and result.get("success"):
+                channel = result.get("channel") or (data or {}).get("channel")
+                if channel:
+                    self.add(channel)
+        elif endpoint in self.LEAVE_ENDPOINTS and data:
+            self.remove(data.get("channel"))
+
+    def stop(self):
+        """ (KeepAlive) -> NoneType
+
+        Stop pinging every channel.
+        """
+        for channel in self.channels:
+            self.remove(channel)
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _ping(self, channel, loop):
+        """ Scheduler job handing the ping of one channel over, without waiting for it. """
+        due = time.monotonic()
+        with self._lock:
+            skipped = channel in self._pending
+            self._pending.add(channel)
+            if loop is None and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="keepalive")
+            executor = self._executor
+        if skipped:
+            # The previous ping has not even finished: this one is late already.
+            self._done(channel, None, TimeoutError(f"Ping of {channel} skipped, the previous one is still running"))
+            return
+        if loop is not None:
+            loop.call_soon_threadsafe(self._send, channel, due)
+            return
+        try:
+            executor.submit(self._send, channel, due)
+        except RuntimeError as ex:
+            # Stopped meanwhile
+            self._pending.discard(channel)
+            self._done(channel, None, ex)
+
+    def _send(self, channel, due):
+        """ Send the ping of one channel, on a worker thread or on the event loop of the client. """
+        late = time.monotonic() - due
+        late = TimeoutError(f"Ping of {channel} started {late:.1f}s late") if late > self.interval else None
+        try:
+            ret = self.client.active_ping(channel)
+            if not inspect.isawaitable(ret):
+                self._pending.discard(channel)
+                self._done(channel, ret, late)
+                return
+            # AsyncClubhouse: run the ping as a task of its event loop.
+            future = asyncio.ensure_future(ret)
+        except Exception as ex:
+            self._pending.discard(channel)
+            self._done(channel, None, ex)
+            return
+        def done(f):
+            self._pending.discard(channel)
+            error = None if f.cancelled() else f.exception()
+            self._done(channel, None if f.cancelled() or error else f.result(), error or late)
+        future.add_done_callback(done)
+
+    def _done(self, channel, result, error):
+        with self._lock:
+            stats = self.stats.get(channel)
+            if stats is None:
+                return
+            stats["pings"] += 1
+            stats["last_ping"] = time.time()
+            if error is None and isinstance(result, dict) and result.get("success", True):
+                stats["consecutive_missed"] = 0
+                return
+            stats["missed"] += 1
+            stats["consecutive_missed"] += 1
+        if self.on_missed is not None:
+            self.on_missed(channel, error if error is not None else result)
@@ -0,0 +1,193 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+metrics.py
+
+Per-endpoint instrumentation of the client: calls, status codes, bytes
+transferred, retries and latency histograms. Read them in-process with
+Metrics.snapshot(), or scrape them in the Prometheus text format.
+"""
+
+import bisect
+import threading
+import collections
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Upper bounds of the latency histogram buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class _EndpointMetrics:
+    """ Counters of one endpoint. """
+
+    __slots__ = ("calls", "errors", "retries", "sent_bytes", "received_bytes", "latency_sum", "statuses", "buckets")
+
+    def __init__(self, num_buckets):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.sent_bytes = 0
+        self.received_bytes = 0
+        self.latency_sum = 0.0
+        self.statuses = collections.Counter()
+        # One more bucket for the latencies above the last bound.
+        self.buckets = [0] * (num_buckets + 1)
+
+class Metrics:
+    """
+    Metrics Class
+
+    Records every call of the clients it is given to. A call is counted
+    once, with the status of its last attempt (or the name of the exception
+    raised when no response was received), its total latency including
+    retries, the bytes of its request bodies and of its response, and its
+    number of retries. Cached and coalesced calls do not reach the network
+    and are not counted.
+
+    One Metrics can be shared by several clients, e.g. every account of a pool.
+
+    >>> metrics = Metrics()
+    >>> clubhouse = Clubhouse(user_id, user_token, user_device, metrics=metrics)
+    >>> metrics.snapshot()["get_channel"]
+    {'calls': 12, 'errors': 0, 'retries': 1, 'statuses': {200: 12}, 'p50': 0.1, ...}
+    >>> metrics.serve(9100)
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="clubhouse"):
+        """ (Metrics, tuple of float, str) -> NoneType """
+        self.bounds = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, status, seconds, sent=0, received=0, retries=0):
+        """ (Metrics, str, int or str, float, int, int, int) -> NoneType
+
+        Record a call. `status` is the HTTP status code of the last attempt,
+        or the name of the exception raised if there was no response.
+        """
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _EndpointMetrics(len(self.bounds))
+            stats.calls += 1
+            if not isinstance(status, int) or status >= 400:
+                stats.errors += 1
+            stats.retries += retries
+            stats.sent_bytes += sent
+            stats.received_bytes += received
+            stats.latency_sum += seconds
+            stats.statuses[status] += 1
+            stats.buckets[index] += 1
+
+    def reset(self):
+        """ (Metrics) -> NoneType """
+        with self._lock:
+            self._endpoints = {}
+
+    def _quantile(self, buckets, calls, quantile):
+        """ Upper bound of the bucket holding the given quantile, None past the last bound. """
+        rank = quantile * calls
+        count = 0
+        for bound, bucket in zip(self.bounds, buckets):
+            count += bucket
+            if count >= rank:
+                return bound
+        return None
+
+    def snapshot(self):
+        """ (Metrics) -> dict
+
+        Get the metrics of every endpoint called so far, as endpoint -> dict.
+        The p50/p90/p99 latencies are the upper bounds of their histogram buckets.
+        """
+        with self._lock:
+            endpoints = {
+                endpoint: (stats.calls, stats.errors, stats.retries, stats.sent_bytes, stats.received_bytes,
+                           stats.latency_sum, dict(stats.statuses), list(stats.buckets))
+                for endpoint, stats in self._endpoints.items()
+            }
+        snapshot = {}
+        for endpoint, (calls, errors, retries, sent, received, latency_sum, statuses, buckets) in endpoints.items():
+            snapshot[endpoint] = {
+                "calls": calls,
+                "errors": errors,
+                "retries": retries,
+                "statuses": statuses,
+                "sent_bytes": sent,
+                "received_bytes": received,
+                "latency_sum": latency_sum,
+                "latency_mean": latency_sum / calls,
+                "p50": self._quantile(buckets, calls, 0.5),
+                "p90": self._quantile(buckets, calls, 0.9),
+                "p99": self._quantile(buckets, calls, 0.99),
+                "histogram": dict(zip(self.bounds + (float("inf"),), buckets)),
+            }
+        return snapshot
+
+    def prometheus(self):
+        """ (Metrics) -> str
+
+        Get the metrics in the Prometheus text exposition format.
+        """
+        name = self.prefix
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = [
+                f"# HELP {name}_requests_total API calls by endpoint and status.",
+                f"# TYPE {name}_requests_total counter",
+            ]
+            for endpoint, stats in endpoints:
+                for status, count in sorted(stats.statuses.items(), key=lambda x: str(x[0])):
+                    lines.append(f'{name}_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+            for metric, field, help_text in (
+                ("retries_total", "retries", "Retried attempts by endpoint."),
+                ("sent_bytes_total", "sent_bytes", "Bytes of request bodies by endpoint."),
+                ("received_bytes_total", "received_bytes", "Bytes of responses by endpoint."),
+            ):
+                lines.append(f"# HELP {name}_{metric} {help_text}")
+                lines.append(f"# TYPE {name}_{metric} counter")
+                for endpoint, stats in endpoints:
+                    lines.append(f'{name}_{metric}{{endpoint="{endpoint}"}} {getattr(stats, field)}')
+            lines.append(f"# HELP {name}_request_duration_seconds Latency of API calls, retries included.")
+            lines.append(f"# TYPE {name}_request_duration_seconds histogram")
+            for endpoint, stats in endpoints:
+                count = 0
+                for bound, bucket in zip(self.bounds + ("+Inf",), stats.buckets):
+                    count += bucket
+                    lines.append(f'{name}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                lines.append(f'{name}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats.latency_sum}')
+                lines.append(f'{name}_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats.calls}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9100, host="127.0.0.1"):
+        """ (Metrics, int, str) -> ThreadingHTTPServer
+
+        Serve the Prometheus text format at http://host:port/metrics from a background thread.
+        Call shutdown() on the returned server to stop it.
+        """
+        httpd = ThreadingHTTPServer((host, port), _Handler)
+        httpd.daemon_threads = True
+        httpd.metrics = self
+        thread = threading.Thread(target=httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return httpd
+
+class _Handler(BaseHTTPRequestHandler):
+    """ Request handler of Metrics.serve(). """
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
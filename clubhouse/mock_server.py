@@ -0,0 +1,394 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+mock_server.py
+
+Local stand-in for the Clubhouse API, serving synthetic data with
+configurable size and latency, for benchmarking and testing the client offline.
+
+    $ python3 -m clubhouse.mock_server --port 8080 --latency 0.05
+
+>>> with MockServer(latency=0.01) as server:
+...     clubhouse = Clubhouse(user_id, user_token, user_device, api_url=server.url)
+...     clubhouse.get_channels()
+
+Every user, follow list and channel is derived from its id on request,
+so the data takes no memory whatever its size.
+"""
+
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+import collections
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class MockData:
+    """
+    MockData Class
+
+    Synthetic users, follow graph and channels. Users have ids 1 to `num_users`
+    and follow `num_follows` users on average. Channel sizes decrease from
+    `channel_size` users for the largest one.
+    """
+
+    def __init__(self, num_users=100000, num_follows=200, num_channels=50, channel_size=500):
+        """ (MockData, int, int, int, int) -> NoneType """
+        self.num_users = num_users
+        self.num_follows = num_follows
+        self.num_channels = num_channels
+        self.channel_size = channel_size
+
+    def user(self, user_id):
+        """ (MockData, int) -> dict """
+        return {
+            "user_id": user_id,
+            "name": f"User {user_id}",
+            "photo_url": f"https://example.com/photos/{user_id}.png",
+            "username": f"user{user_id}",
+            "bio": f"Synthetic user #{user_id}",
+            "twitter": None,
+            "instagram": None,
+        }
+
+    def profile(self, user_id):
+        """ (MockData, int) -> dict """
+        profile = self.user(user_id)
+        profile.update({
+            "displayname": profile["name"],
+            "num_followers": self._follow_count(user_id, 1),
+            "num_following": self._follow_count(user_id, 0),
+            "time_created": "2021-01-01T00:00:00.000000+00:00",
+            "url": f"https://www.joinclubhouse.com/@user{user_id}",
+            "clubs": [],
+            "topics": [],
+        })
+        return profile
+
+    def _follow_count(self, user_id, salt):
+        return (user_id * 2654435761 + salt * 40503) % (2 * self.num_follows + 1)
+
+    def _follow_id(self, user_id, i, salt):
+        return (user_id * 7919 + (i + 1) * (104729 + salt * 2)) % self.num_users + 1
+
+    def follows(self, user_id, followers, page, page_size):
+        """ (MockData, int, bool, int, int) -> dict
+
+        Get a page of the users followed by user_id, or of its followers.
+        """
+        salt = 1 if followers else 0
+        count = self._follow_count(user_id, salt) if 1 <= user_id <= self.num_users else 0
+        return self.page(count, page, page_size, lambda i: self.user(self._follow_id(user_id, i, salt)))
+
+    def page(self, count, page, page_size, item):
+        """ (MockData, int, int, int, callable) -> dict
+
+        Get a page of users in the format of the paged endpoints.
+        """
+        start = (page - 1) * page_size
+        end = min(count, start + page_size)
+        return {
+            "users": [item(i) for i in range(start, end)],
+            "count": count,
+            "next": page + 1 if end < count else None,
+            "previous": page - 1 if page > 1 else None,
+            "success": True,
+        }
+
+    def channel_name(self, index):
+        """ (MockData, int) -> str """
+        return f"mock{index:06d}"
+
+    def channel_index(self, channel):
+        """ (MockData, str) -> int
+
+        Get the index of a channel from its name, or None if there is no such channel.
+        """
+        try:
+            index = int(channel[4:]) if channel.startswith("mock") else -1
+        except ValueError:
+            return None
+        return index if 0 <= index < self.num_channels else None
+
+    def channel_users(self, index):
+        """ (MockData, int) -> list of dict """
+        size = max(2, int(self.channel_size / (index + 1) ** 0.5))
+        users = []
+        for i in range(size):
+            user = self.user((index * 7919 + i * 31) % self.num_users + 1)
+            user.update({
+                "is_speaker": i < 5,
+                "is_moderator": i == 0,
+                "is_new": False,
+                "is_followed_by_speaker": False,
+                "is_invited_as_speaker": False,
+                "time_joined_as_speaker": None,
+            })
+            users.append(user)
+        return users
+
+    def channel(self, index):
+        """ (MockData, int) -> dict """
+        users = self.channel_users(index)
+        return {
+            "channel": self.channel_name(index),
+            "channel_id": index + 1,
+            "topic": f"Mock channel {index}",
+            "url": f"https://www.joinclubhouse.com/room/{self.channel_name(index)}",
+            "is_private": False,
+            "is_social_mode": False,
+            "num_speakers": min(5, len(users)),
+            "num_all": len(users),
+            "num_other": max(0, len(users) - 5),
+            "users": users,
+            "token": "mock-token",
+            "success": True,
+        }
+
+    def channels(self):
+        """ (MockData) -> dict """
+        channels = []
+        for index in range(self.num_channels):
+            users = self.channel_users(index)
+            channels.append({
+                "channel": self.channel_name(index),
+                "channel_id": index + 1,
+                "topic": f"Mock channel {index}",
+                "num_speakers": min(5, len(users)),
+                "num_all": len(users),
+                "num_other": max(0, len(users) - 5),
+                "users": users[:5],
+            })
+        return {"channels": channels, "events": [], "success": True}
+
+class MockServer:
+    """
+    MockServer Class
+
+    Serves the endpoints used by Clubhouse on `host`:`port` (0 picks a free port).
+    Each response is delayed by `latency` seconds plus up to `jitter` seconds;
+    `latencies` overrides the latency of the given endpoints. A share
+    `error_rate` of the requests fails with 503, for testing retries.
+    Endpoints without synthetic data reply {"success": true}.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, data=None, latency=0.0, jitter=0.0, latencies=None, error_rate=0.0):
+        """ (MockServer, str, int, MockData, float, float, dict, float) -> NoneType """
+        self.data = data or MockData()
+        self.latency = latency
+        self.jitter = jitter
+        self.latencies = dict(latencies or {})
+        self.error_rate = error_rate
+        self.requests = collections.Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.mock = self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def url(self):
+        """ (MockServer) -> str
+
+        API URL to pass to the client as `api_url`.
+        """
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        """ (MockServer) -> MockServer
+
+        Serve in a background thread.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """ (MockServer) -> NoneType """
+        self._httpd.serve_forever()
+
+    def stop(self):
+        """ (MockServer) -> NoneType """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def handle(self, endpoint, params, user_id):
+        """ (MockServer, str, dict, int) -> (int, dict)
+
+        Get the status and the response of a request.
+        """
+        with self._lock:
+            self.requests[endpoint] += 1
+        delay = self.latencies.get(endpoint, self.latency)
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            return 503, {"success": False, "error_message": "Service unavailable"}
+        handler = getattr(self, "_" + endpoint, None)
+        if handler is None:
+            return 200, {"success": True}
+        return 200, handler(params, user_id)
+
+    def _paged(self, params, followers):
+        return self.data.follows(
+            int(params.get("user_id", 0)), followers,
+            int(params.get("page", 1)), int(params.get("page_size", 50))
+        )
+
+    def _get_following(self, params, user_id):
+        return self._paged(params, False)
+
+    def _get_followers(self, params, user_id):
+        return self._paged(params, True)
+
+    def _get_mutual_follows(self, params, user_id):
+        return self._paged(params, False)
+
+    def _get_suggested_follows_all(self, params, user_id):
+        return self.data.follows(user_id, False, int(params.get("page", 1)), int(params.get("page_size", 50)))
+
+    def _get_profile(self, params, user_id):
+        return {"user_profile": self.data.profile(int(params.get("user_id", user_id))), "success": True}
+
+    def _me(self, params, user_id):
+        return {
+            "user_profile": self.data.profile(user_id),
+            "num_invites": 0,
+            "has_unread_notifications": False,
+            "success": True,
+        }
+
+    def _check_waitlist_status(self, params, user_id):
+        return {"is_waitlisted": False, "is_onboarding": False, "success": True}
+
+    def _get_channels(self, params, user_id):
+        return self.data.channels()
+
+    def _get_channel(self, params, user_id):
+        index = self.data.channel_index(str(params.get("channel", "")))
+        if index is None:
+            return {"success": False, "error_message": "That room is no longer available"}
+        return self.data.channel(index)
+
+    _join_channel = _get_channel
+
+    def _active_ping(self, params, user_id):
+        return {"should_leave": False, "success": True}
+
+    def _get_online_friends(self, params, user_id):
+        users = self.data.follows(user_id, False, 1, 20)["users"]
+        return {"users": users, "clubs": [], "success": True}
+
+    def _get_notifications(self, params, user_id):
+        page, page_size = int(params.get("page", 1)), int(params.get("page_size", 20))
+        result = self.data.page(100, page, page_size, lambda i: {
+            "notification_id": i + 1,
+            "user_profile": self.data.user(i + 1),
+            "event_id": None,
+            "type": 1,
+            "is_unread": False,
+            "time_created": "2021-01-01T00:00:00.000000+00:00",
+            "message": "started following you",
+        })
+        result["notifications"] = result.pop("users")
+        return result
+
+    def _search_users(self, params, user_id):
+        start = zlib.crc32(str(params.get("query", "")).encode("utf-8"))
+        users = [self.data.user((start + i) % self.data.num_users + 1) for i in range(20)]
+        return {"users": users, "count": len(users), "next": None, "previous": None, "success": True}
+
+    def _search_clubs(self, params, user_id):
+        start = zlib.crc32(str(params.get("query", "")).encode("utf-8"))
+        clubs = [{"club_id": start % 100000 + i, "name": f"Club {i}", "num_members": 10 * i} for i in range(10)]
+        return {"clubs": clubs, "count": len(clubs), "next": None, "previous": None, "success": True}
+
+class _Server(ThreadingHTTPServer):
+    """ HTTP server of MockServer, accepting many connections at once. """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients drop connections on timeouts and deadlines, do not print a traceback for those.
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+class _Handler(BaseHTTPRequestHandler):
+    """ Request handler of MockServer. """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, do not let Nagle delay the body.
+    disable_nagle_algorithm = True
+
+    def _reply(self, params):
+        endpoint = urllib.parse.urlsplit(self.path).path.rsplit("/", 1)[-1]
+        try:
+            user_id = int(self.headers.get("CH-UserID"))
+        except (TypeError, ValueError):
+            user_id = 1
+        status, result = self.server.mock.handle(endpoint, params, user_id)
+        body = json.dumps(result).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply(dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query)))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        try:
+            params = json.loads(body) if body else {}
+        except ValueError:
+            # Multipart uploads
+            params = {}
+        self._reply(params if isinstance(params, dict) else {})
+
+    def log_message(self, *args):
+        pass
+
+def main():
+    """ () -> NoneType
+
+    Run the mock server from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Local mock Clubhouse API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--users", type=int, default=100000, help="number of synthetic users")
+    parser.add_argument("--follows", type=int, default=200, help="average number of follows per user")
+    parser.add_argument("--channels", type=int, default=50, help="number of channels")
+    parser.add_argument("--channel-size", type=int, default=500, help="users in the largest channel")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random seconds added on top of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 503")
+    args = parser.parse_args()
+
+    data = MockData(args.users, args.follows, args.channels, args.channel_size)
+    server = MockServer(args.host, args.port, data, args.latency, args.jitter, error_rate=args.error_rate)
+    print(f"[.] Serving the mock API at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
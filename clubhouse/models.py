@@ -0,0 +1,228 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+models.py
+
+Typed, memory-efficient views of API responses.
+
+The client returns plain dicts. Models take far less memory per record
+than those dicts, which matters when keeping millions of users from
+get_followers or search_users:
+
+>>> users = [User.from_dict(x) for x in clubhouse.get_followers(user_id)['users']]
+>>> users[0].username
+>>> users = list(clubhouse.iter_followers(user_id, typed=True))
+
+Missing fields read as None. Nested records (a user's clubs, a channel's
+users, ...) are kept as returned and only turned into models on first access.
+to_dict() gives back the original record.
+"""
+class _Nested:
+    """ Attribute decoding a nested record, or list of records, on first access. """
+
+    def __init__(self, key, model, many):
+        self.key = key
+        self.model = model
+        self.many = many
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        extra = obj._extra
+        value = extra.get(self.key) if extra else None
+        if value is None:
+            return None
+        model = _MODELS[self.model]
+        if self.many:
+            if value and isinstance(value[0], dict):
+                value = extra[self.key] = [model.from_dict(x) for x in value]
+        elif isinstance(value, dict):
+            value = extra[self.key] = model.from_dict(value)
+        return value
+
+    def __set__(self, obj, value):
+        if obj._extra is None:
+            obj._extra = {}
+        obj._extra[self.key] = value
+
+class Model:
+    """
+    Model Class
+
+    Base class of the models. Subclasses list the fields found in almost
+    every record in FIELDS, which get a slot of their own. Less common fields
+    are listed in OPTIONAL and nested records in NESTED as
+    key -> (model name, is a list); both are kept in a dict created only for
+    the records that have them, along with unknown fields.
+    Every field, known or not, reads as an attribute.
+    """
+
+    __slots__ = ("_extra",)
+
+    FIELDS = ()
+    OPTIONAL = ()
+    NESTED = {}
+    _KEYS = frozenset()
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        for key, (model, many) in cls.NESTED.items():
+            setattr(cls, key, _Nested(key, model, many))
+        cls._KEYS = frozenset(cls.FIELDS)
+        cls._OPTIONAL = frozenset(cls.OPTIONAL)
+        _MODELS[cls.__name__] = cls
+
+    def __init__(self, **fields):
+        """ (Model, ...) -> NoneType """
+        self._set(fields)
+
+    def __getattr__(self, name):
+        # Only called for unset slots and for fields without a slot.
+        if name in self._KEYS or name == "_extra":
+            return None
+        extra = self._extra
+        if extra is not None and name in extra:
+            return extra[name]
+        if name in self._OPTIONAL:
+            return None
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{x}={getattr(self, x)!r}" for x in self.FIELDS[:3] if getattr(self, x) is not None
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def _set(self, data):
+        keys = self._KEYS
+        extra = None
+        for key, value in data.items():
+            if key in keys:
+                setattr(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        if extra is not None:
+            self._extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        """ (type, dict) -> Model
+
+        Build a model from a record of an API response.
+        """
+        obj = cls.__new__(cls)
+        obj._set(data)
+        return obj
+
+    def to_dict(self):
+        """ (Model) -> dict
+
+        Get the record back as a dict, nested models included.
+        """
+        data = {}
+        for key in self.FIELDS:
+            try:
+                data[key] = object.__getattribute__(self, key)
+            except AttributeError:
+                pass
+        for key, value in (self._extra or {}).items():
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, list) and value and isinstance(value[0], Model):
+                value = [x.to_dict() for x in value]
+            data[key] = value
+        return data
+
+_MODELS = {}
+
+class Topic(Model):
+    """ Topic, as returned by get_all_topics, get_topic or in user and club profiles. """
+
+    FIELDS = ("id", "title", "abbreviated_title", "url")
+    NESTED = {"topics": ("Topic", True)}
+    __slots__ = FIELDS
+
+class Club(Model):
+    """ Club, as returned by get_club, get_clubs_for_topic or in profiles and channels. """
+
+    FIELDS = (
+        "club_id", "name", "description", "photo_url", "num_members", "num_followers",
+        "num_online", "rules", "url",
+    )
+    OPTIONAL = (
+        "enable_private", "is_follow_allowed", "is_membership_private", "is_community",
+        "is_member", "is_admin", "is_follower", "is_pending_accept", "is_pending_approval",
+    )
+    NESTED = {"topics": ("Topic", True)}
+    __slots__ = FIELDS
+
+class User(Model):
+    """ User, as returned by paged user lists, get_profile or in channels. """
+
+    FIELDS = (
+        "user_id", "username", "name", "photo_url", "bio", "twitter", "instagram",
+        "is_speaker", "is_moderator",
+    )
+    OPTIONAL = (
+        "displayname", "url", "num_followers", "num_following", "time_created",
+        "is_new", "is_followed_by_speaker", "is_invited_as_speaker",
+        "time_joined_as_speaker", "first_name", "skintone", "last_active_minutes",
+        "follows_me", "is_blocked_by_network", "mutual_follows_count", "notification_type",
+    )
+    NESTED = {
+        "clubs": ("Club", True),
+        "topics": ("Topic", True),
+        "club": ("Club", False),
+        "invited_by_user_profile": ("User", False),
+        "mutual_follows": ("User", True),
+    }
+    __slots__ = FIELDS
+
+class Channel(Model):
+    """ Channel, as returned by get_channel, join_channel or get_channels. """
+
+    FIELDS = (
+        "channel", "channel_id", "topic", "url", "is_private", "is_social_mode",
+        "num_speakers", "num_all", "num_other", "success",
+    )
+    OPTIONAL = (
+        "has_blocked_speakers", "is_explore_channel", "is_handraise_enabled",
+        "handraise_permission", "is_club_admin", "is_club_member", "creator_user_profile_id",
+        "token", "rtm_token", "pubnub_token", "pubnub_origin", "pubnub_heartbeat_value",
+        "pubnub_heartbeat_interval", "pubnub_enable", "agora_native_mute",
+    )
+    NESTED = {
+        "users": ("User", True),
+        "club": ("Club", False),
+        "welcome_for_user_profile": ("User", False),
+    }
+    __slots__ = FIELDS
+
+class Event(Model):
+    """ Event, as returned by get_events, get_event or get_events_for_user. """
+
+    FIELDS = (
+        "event_id", "name", "description", "time_start", "is_expired",
+        "is_member_only", "url", "channel", "club_is_member", "club_is_follower",
+    )
+    NESTED = {
+        "hosts": ("User", True),
+        "club": ("Club", False),
+    }
+    __slots__ = FIELDS
+
+class Notification(Model):
+    """ Notification, as returned by get_notifications. """
+
+    FIELDS = (
+        "notification_id", "type", "is_unread", "message", "time_created",
+        "event_id", "channel", "in_app",
+    )
+    NESTED = {
+        "user_profile": ("User", False),
+        "club": ("Club", False),
+    }
+    __slots__ = FIELDS
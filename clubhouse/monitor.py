@@ -0,0 +1,193 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+monitor.py
+
+Watch a channel and get events for what changed since the last poll,
+instead of going through the whole user list of get_channel every time.
+"""
+
+import threading
+import collections
+
+# Event types
+JOIN = "join"
+LEAVE = "leave"
+SPEAKER = "speaker"
+MODERATOR = "moderator"
+END = "end"
+
+ChannelEvent = collections.namedtuple("ChannelEvent", ("type", "channel", "user_id", "user", "value"))
+ChannelEvent.__doc__ = """
+Change in a channel.
+
+    type: JOIN, LEAVE, SPEAKER, MODERATOR or END
+    user: the user as returned by get_channel (the last known one for LEAVE)
+    value: the new is_speaker / is_moderator flag, None for other events
+"""
+
+class ChannelSnapshot:
+    """
+    ChannelSnapshot Class
+
+    Users of a channel indexed by user_id, updated from get_channel responses.
+
+    An error response keeps the users as they were. The channel ends when
+    the server says it is gone, or after `max_failures` failed polls in a row.
+    """
+
+    # Error messages of get_channel meaning that the channel has ended.
+    ENDED_MESSAGES = ("no longer available",)
+
+    def __init__(self, channel, max_failures=5):
+        self.channel = channel
+        self.max_failures = max_failures
+        self.failures = 0
+        self.users = {}
+        self._state = {}
+
+    def __len__(self):
+        return len(self.users)
+
+    def __contains__(self, user_id):
+        return user_id in self.users
+
+    def is_speaker(self, user_id):
+        """ (ChannelSnapshot, int) -> bool """
+        return self._state.get(user_id, (False, False))[0]
+
+    def is_moderator(self, user_id):
+        """ (ChannelSnapshot, int) -> bool """
+        return self._state.get(user_id, (False, False))[1]
+
+    def update(self, channel_info):
+        """ (ChannelSnapshot, dict) -> list of ChannelEvent
+
+        Apply a get_channel response and get what changed.
+        """
+        if not channel_info.get("success", True):
+            message = str(channel_info.get("error_message") or "").lower()
+            if any(x in message for x in self.ENDED_MESSAGES):
+                return self.end()
+            return self.fail()
+
+        self.failures = 0
+        events = []
+        users = {}
+        state = {}
+        joined = 0
+        previous = self._state
+        for user in channel_info.get("users") or ():
+            user_id = user['user_id']
+            current = (bool(user.get('is_speaker')), bool(user.get('is_moderator')))
+            users[user_id] = user
+            state[user_id] = current
+            old = previous.get(user_id)
+            if old is None:
+                joined += 1
+                events.append(ChannelEvent(JOIN, self.channel, user_id, user, None))
+            elif old != current:
+                if old[0] != current[0]:
+                    events.append(ChannelEvent(SPEAKER, self.channel, user_id, user, current[0]))
+                if old[1] != current[1]:
+                    events.append(ChannelEvent(MODERATOR, self.channel, user_id, user, current[1]))
+        # Nobody left unless the user count says so
+        if len(previous) + joined != len(state):
+            for user_id in previous.keys() - state.keys():
+                events.append(ChannelEvent(LEAVE, self.channel, user_id, self.users[user_id], None))
+        self.users, self._state = users, state
+        return events
+
+    def fail(self):
+        """ (ChannelSnapshot) -> list of ChannelEvent
+
+        Record a failed poll. Returns END once too many polls failed in a row.
+        """
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            return self.end()
+        return []
+
+    def end(self):
+        """ (ChannelSnapshot) -> list of ChannelEvent
+
+        Clear the users of the channel and get the END event.
+        """
+        self.users, self._state = {}, {}
+        return [ChannelEvent(END, self.channel, None, None, None)]
+
+class ChannelMonitor:
+    """
+    ChannelMonitor Class
+
+    Polls get_channel for a single channel. The interval shrinks towards
+    `min_interval` while the channel is busy and grows towards `max_interval`
+    while nothing changes, and doubles up to `max_interval` while polls fail.
+
+    >>> monitor = ChannelMonitor(clubhouse, channel)
+    >>> stopped = monitor.start(print)
+    >>> ...
+    >>> stopped.set()
+    """
+
+    def __init__(self, client, channel, interval=10.0, min_interval=2.0, max_interval=30.0, max_failures=5):
+        """ (ChannelMonitor, Clubhouse, str, float, float, float, int) -> NoneType """
+        self.client = client
+        self.channel = channel
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.snapshot = ChannelSnapshot(channel, max_failures)
+
+    def adapt(self, events):
+        """ (ChannelMonitor, list of ChannelEvent) -> float
+
+        Adjust the polling interval after a poll and return it.
+        """
+        if self.snapshot.failures:
+            self.interval = min(self.max_interval, self.interval * 2)
+        elif events:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        return self.interval
+
+    def poll(self):
+        """ (ChannelMonitor) -> list of ChannelEvent
+
+        Fetch the channel once and get what changed since the last poll.
+        The first poll reports every user as joining.
+        """
+        try:
+            info = self.client.get_channel(self.channel)
+        except Exception:
+            events = self.snapshot.fail()
+        else:
+            events = self.snapshot.update(info)
+        self.adapt(events)
+        return events
+
+    def run(self, callback, stopped=None):
+        """ (ChannelMonitor, callable, threading.Event) -> NoneType
+
+        Poll until `stopped` is set or the channel ends, calling callback(event) for each event.
+        """
+        stopped = stopped or threading.Event()
+        while not stopped.is_set():
+            for event in self.poll():
+                callback(event)
+                if event.type == END:
+                    return
+            stopped.wait(self.interval)
+
+    def start(self, callback):
+        """ (ChannelMonitor, callable) -> threading.Event
+
+        Run the monitor in a daemon thread. Set the returned event to stop it.
+        """
+        stopped = threading.Event()
+        thread = threading.Thread(target=self.run, args=(callback, stopped))
+        thread.daemon = True
+        thread.start()
+        return stopped
@@ -0,0 +1,220 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+paging.py
+
+Stream items of paged endpoints (get_followers, get_following, ...) across pages.
+
+Pages are fetched one after another by default. With `concurrency` above 1,
+the page count is taken from the `count` of the first response and the
+remaining pages are fetched in parallel, at most `concurrency` at a time.
+Items are then yielded in page order, or as soon as each page arrives
+if `ordered` is False.
+
+A page answered with an error body raises PageError, so that a failed page
+is never mistaken for the end of the list.
+"""
+
+import math
+import itertools
+import asyncio
+import contextvars
+import collections
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+from .deadline import remaining as deadline_remaining, DeadlineExceeded
+
+class PageError(Exception):
+    """ Raised when a page of a paged endpoint is answered with an error. """
+
+    def __init__(self, page, result):
+        """ (PageError, int, dict) -> NoneType """
+        super().__init__(f"Page {page} failed: {result.get('error_message') or 'success is false'}")
+        self.page = page
+        self.result = result
+
+def _check(result, page):
+    """ (dict, int) -> dict
+
+    Get the response of a page, raising PageError if it is an error.
+    """
+    if isinstance(result, dict) and result.get("success") is False:
+        raise PageError(page, result)
+    return result
+
+def _checked(fetch):
+    """ (callable) -> callable
+
+    Wrap a page fetch to raise PageError on error responses.
+    """
+    def fetch_page(page):
+        return _check(fetch(page=page), page)
+    return fetch_page
+
+def _achecked(fetch):
+    """ (coroutine function) -> coroutine function
+
+    Same as _checked, for a fetch that is a coroutine function.
+    """
+    async def fetch_page(page):
+        return _check(await fetch(page=page), page)
+    return fetch_page
+
+def _next_page(result, key, page, page_size):
+    """ (dict, str, int, int) -> int
+
+    Get the page to fetch after the given response, or None on the last page.
+    """
+    if not result.get(key):
+        return None
+    if "next" in result:
+        return result["next"]
+    if len(result[key]) < page_size:
+        return None
+    return page + 1
+
+def _last_page(result, page_size):
+    """ (dict, int) -> int
+
+    Get the last page number from the total `count` of the first response.
+    """
+    count = result.get("count")
+    if not isinstance(count, int):
+        return None
+    return math.ceil(count / page_size)
+
+def _items(result, key, decode):
+    """ (dict, str, callable) -> iterable
+
+    Get the items of a page, passed through `decode` if given.
+    """
+    items = result.get(key) or ()
+    return map(decode, items) if decode else items
+
+def _submit(executor, fetch, page):
+    """ (ThreadPoolExecutor, callable, int) -> Future
+
+    Fetch a page in the background, within the deadline of the caller.
+    """
+    return executor.submit(contextvars.copy_context().run, fetch, page=page)
+
+def _result(future):
+    """ (Future) -> dict
+
+    Wait for a page fetched in the background, at most until the deadline.
+    """
+    try:
+        return future.result(timeout=deadline_remaining())
+    except FutureTimeout:
+        raise DeadlineExceeded("Deadline exceeded while waiting for a page") from None
+
+def iter_pages(fetch, key, page_size, prefetch=False, concurrency=1, ordered=True, decode=None):
+    """ (callable, str, int, bool, int, bool, callable) -> generator
+
+    Yield every item under `key` of the pages returned by `fetch(page=...)`.
+    With `prefetch`, the next page is requested in the background
+    while the current one is being consumed.
+    Items are passed through `decode`, e.g. User.from_dict, if given.
+    Raises PageError if a page is answered with an error.
+    """
+    fetch = _checked(fetch)
+    executor = None
+    pending = collections.deque()
+    try:
+        page = 1
+        result = fetch(page=page)
+        last_page = _last_page(result, page_size)
+        if concurrency > 1 and (last_page or 0) > 1 and _next_page(result, key, page, page_size):
+            executor = ThreadPoolExecutor(max_workers=concurrency)
+            yield from _items(result, key, decode)
+            pages = iter(range(page + 1, last_page + 1))
+            for next_page in itertools.islice(pages, concurrency):
+                pending.append((next_page, _submit(executor, fetch, next_page)))
+            while pending:
+                if ordered:
+                    done_page, future = pending.popleft()
+                else:
+                    wait([x[1] for x in pending], timeout=deadline_remaining(), return_when=FIRST_COMPLETED)
+                    done_page, future = next((x for x in pending if x[1].done()), pending[0])
+                    pending.remove((done_page, future))
+                done = _result(future)
+                yield from _items(done, key, decode)
+                if done_page >= page:
+                    page, result = done_page, done
+                next_page = next(pages, None)
+                if next_page:
+                    pending.append((next_page, _submit(executor, fetch, next_page)))
+            # The list may have grown since the first page, continue sequentially.
+            page = _next_page(result, key, page, page_size)
+            if not page:
+                return
+            result = fetch(page=page)
+        elif prefetch:
+            executor = ThreadPoolExecutor(max_workers=1)
+
+        while True:
+            next_page = _next_page(result, key, page, page_size)
+            if executor and next_page:
+                pending.append((next_page, _submit(executor, fetch, next_page)))
+            yield from _items(result, key, decode)
+            if not next_page:
+                return
+            page = next_page
+            result = _result(pending.popleft()[1]) if pending else fetch(page=page)
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if executor:
+            executor.shutdown(wait=False)
+
+async def aiter_pages(fetch, key, page_size, prefetch=False, concurrency=1, ordered=True, decode=None):
+    """ (coroutine function, str, int, bool, int, bool, callable) -> async generator
+
+    Same as iter_pages, for a fetch that is a coroutine function.
+    """
+    fetch = _achecked(fetch)
+    pending = collections.deque()
+    try:
+        page = 1
+        result = await fetch(page=page)
+        last_page = _last_page(result, page_size)
+        if concurrency > 1 and (last_page or 0) > 1 and _next_page(result, key, page, page_size):
+            for item in _items(result, key, decode):
+                yield item
+            pages = iter(range(page + 1, last_page + 1))
+            for next_page in itertools.islice(pages, concurrency):
+                pending.append((next_page, asyncio.ensure_future(fetch(page=next_page))))
+            while pending:
+                if ordered:
+                    done_page, task = pending.popleft()
+                else:
+                    await asyncio.wait([x[1] for x in pending], return_when=asyncio.FIRST_COMPLETED)
+                    done_page, task = next(x for x in pending if x[1].done())
+                    pending.remove((done_page, task))
+                done = await task
+                for item in _items(done, key, decode):
+                    yield item
+                if done_page >= page:
+                    page, result = done_page, done
+                next_page = next(pages, None)
+                if next_page:
+                    pending.append((next_page, asyncio.ensure_future(fetch(page=next_page))))
+            # The list may have grown since the first page, continue sequentially.
+            page = _next_page(result, key, page, page_size)
+            if not page:
+                return
+            result = await fetch(page=page)
+
+        while True:
+            next_page = _next_page(result, key, page, page_size)
+            if prefetch and next_page:
+                pending.append((next_page, asyncio.ensure_future(fetch(page=next_page))))
+            for item in _items(result, key, decode):
+                yield item
+            if not next_page:
+                return
+            page = next_page
+            result = await pending.popleft()[1] if pending else await fetch(page=page)
+    finally:
+        for _, task in pending:
+            task.cancel()
@@ -0,0 +1,173 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+pool.py
+
+Drive many authenticated accounts from a single process.
+"""
+
+import time
+import threading
+import configparser
+from concurrent.futures import ThreadPoolExecutor
+from .clubhouse import Clubhouse
+from .ratelimit import TokenBucket
+
+class _Account:
+    """
+    A client and its bookkeeping inside ClubhousePool.
+    """
+
+    def __init__(self, client, rate, burst):
+        self.client = client
+        self.budget = TokenBucket(rate, burst) if rate else None
+        self.in_flight = 0
+
+    def delay(self, now):
+        """ (_Account, float) -> float
+
+        Seconds to wait until this account may send another request.
+        """
+        return self.budget.delay(now) if self.budget else 0.0
+
+    def reserve(self, now):
+        """ (_Account, float) -> float
+
+        Take one call from the budget and get the seconds to wait before sending.
+        """
+        return self.budget.reserve(now) if self.budget else 0.0
+
+class ClubhousePool:
+    """
+    ClubhousePool Class
+
+    Holds one Clubhouse client per account and dispatches each call to the
+    least loaded account that is within its rate budget.
+
+    >>> pool = ClubhousePool.from_config("setting.ini", rate=1, burst=5)
+    >>> pool.call("get_profile", 4)
+    >>> profiles = list(pool.map("get_profile", user_ids))
+    """
+
+    # Fields required for an account, same as the ones written by cli.write_config
+    ACCOUNT_FIELDS = ("user_id", "user_token", "user_device")
+
+    def __init__(self, accounts, rate=1.0, burst=5, max_workers=None, client_class=Clubhouse, **client_kwargs):
+        """ (ClubhousePool, list of dict, float, int, int, type, ...) -> NoneType
+
+        `accounts` is a list of dicts with `user_id`, `user_token` and `user_device`.
+        `rate` is the number of calls per second allowed for each account (0 = unlimited),
+        `burst` is the number of calls an idle account may send at once.
+        Other keyword arguments are passed to each client. A `rate_limiter`
+        passed this way is shared, i.e. its endpoint budgets span all accounts.
+        """
+        if not accounts:
+            raise ValueError("ClubhousePool requires at least one account")
+        self._accounts = []
+        for account in accounts:
+            client = client_class(
+                user_id=account['user_id'],
+                user_token=account['user_token'],
+                user_device=account['user_device'],
+                **client_kwargs
+            )
+            self._accounts.append(_Account(client, rate, burst))
+        self._lock = threading.Lock()
+        self._max_workers = max_workers or 4 * len(self._accounts)
+        self._executor = None
+
+    @classmethod
+    def from_config(cls, filename='setting.ini', **kwargs):
+        """ (type, str, ...) -> ClubhousePool
+
+        Load every section of the given config file that holds an account.
+        The format is the same as the one of cli.write_config.
+
+        [Account]
+        user_id = ...
+        user_token = ...
+        user_device = ...
+
+        [Account2]
+        ...
+        """
+        config = configparser.ConfigParser()
+        config.read(filename)
+        accounts = [
+            dict(config[section]) for section in config.sections()
+            if all(config[section].get(field) for field in cls.ACCOUNT_FIELDS)
+        ]
+        return cls(accounts, **kwargs)
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def clients(self):
+        """ (ClubhousePool) -> list of Clubhouse
+
+        Clients of every account, in the order they were loaded.
+        """
+        return [account.client for account in self._accounts]
+
+    def _acquire(self):
+        """ (ClubhousePool) -> (_Account, float)
+
+        Pick the account that can send the soonest, then the least busy one.
+        Returns the account and how long to wait before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            account = min(self._accounts, key=lambda x: (x.delay(now), x.in_flight))
+            delay = account.reserve(now)
+            account.in_flight += 1
+        return account, delay
+
+    def _release(self, account):
+        with self._lock:
+            account.in_flight -= 1
+
+    def call(self, method, *args, **kwargs):
+        """ (ClubhousePool, str, ...) -> dict
+
+        Call the given endpoint method on the least loaded account.
+
+        >>> pool.call("get_channel", "xxxxxxxx")
+        """
+        account, delay = self._acquire()
+        try:
+            if delay:
+                time.sleep(delay)
+            return getattr(account.client, method)(*args, **kwargs)
+        finally:
+            self._release(account)
+
+    def map(self, method, *iterables):
+        """ (ClubhousePool, str, iterable, ...) -> iterator of dict
+
+        Fan out calls of the given endpoint method across all accounts.
+        Works like Executor.map: results are yielded in order.
+
+        >>> for profile in pool.map("get_profile", [1, 2, 3]):
+        ...     print(profile)
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        return self._executor.map(lambda *args: self.call(method, *args), *iterables)
+
+    def close(self):
+        """ (ClubhousePool) -> NoneType
+
+        Stop the workers and close every client.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+        for account in self._accounts:
+            account.client.close()
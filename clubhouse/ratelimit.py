@@ -0,0 +1,97 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+ratelimit.py
+
+Client-side rate limiting with token buckets.
+Buckets are thread-safe and never block while holding their lock,
+so they can be shared by threads and coroutines of the same client.
+"""
+
+import time
+import threading
+
+class TokenBucket:
+    """
+    TokenBucket Class
+
+    Allows `rate` calls per second on average, with bursts of up to `burst` calls.
+    Calls over the budget are not rejected but delayed: reserve() takes a token
+    in advance and tells the caller how long to wait.
+    """
+
+    def __init__(self, rate, burst=1):
+        """ (TokenBucket, float, int) -> NoneType """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, now=None):
+        """ (TokenBucket, float) -> float
+
+        Seconds until a token is available, without taking it.
+        """
+        with self._lock:
+            self._refill(time.monotonic() if now is None else now)
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+    def reserve(self, now=None):
+        """ (TokenBucket, float) -> float
+
+        Take a token and get the seconds to wait before using it.
+        """
+        with self._lock:
+            self._refill(time.monotonic() if now is None else now)
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+class RateLimiter:
+    """
+    RateLimiter Class
+
+    One token bucket per endpoint. Endpoints listed in `limits` get their own
+    (rate, burst), every other endpoint gets the default `rate` and `burst`.
+    A rate of None means unlimited.
+
+    >>> limiter = RateLimiter(rate=2, burst=5, limits={"active_ping": (1 / 30, 1), "search_users": (0.5, 2)})
+    >>> clubhouse = Clubhouse(user_id, user_token, user_device, rate_limiter=limiter)
+    """
+
+    def __init__(self, rate=None, burst=1, limits=None):
+        """ (RateLimiter, float, int, dict) -> NoneType """
+        self._default = (rate, burst)
+        self._limits = dict(limits or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint):
+        """ (RateLimiter, str) -> TokenBucket
+
+        Get the bucket of the given endpoint, or None if it is unlimited.
+        """
+        try:
+            return self._buckets[endpoint]
+        except KeyError:
+            pass
+        with self._lock:
+            if endpoint not in self._buckets:
+                rate, burst = self._limits.get(endpoint, self._default)
+                self._buckets[endpoint] = TokenBucket(rate, burst) if rate else None
+            return self._buckets[endpoint]
+
+    def reserve(self, endpoint):
+        """ (RateLimiter, str) -> float
+
+        Take a token for the given endpoint and get the seconds to wait before sending.
+        """
+        bucket = self.bucket(endpoint)
+        return bucket.reserve() if bucket else 0.0
@@ -0,0 +1,88 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+retry.py
+
+Retry policy for transient failures: throttling (429), server errors (5xx)
+and dropped connections.
+"""
+
+import time
+import random
+import email.utils
+
+class RetryPolicy:
+    """
+    RetryPolicy Class
+
+    Retries up to `max_attempts` in total, waiting `backoff * 2 ** (attempt - 1)`
+    seconds (at most `max_backoff`) between attempts. With `jitter`, the wait is
+    drawn uniformly from zero to that value so that many clients do not retry in sync.
+    A Retry-After header sent by the server takes precedence.
+
+    Requests to non-idempotent endpoints are only retried when the server is
+    known not to have processed them: on 429, or when the connection could not
+    be established in the first place.
+    """
+
+    RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+    def __init__(self, max_attempts=3, backoff=0.5, max_backoff=30.0, jitter=True, statuses=RETRY_STATUSES, respect_retry_after=True):
+        """ (RetryPolicy, int, float, float, bool, set of int, bool) -> NoneType """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry(self, attempt, idempotent, status=None, sent=True):
+        """ (RetryPolicy, int, bool, int, bool) -> bool
+
+        Check whether the given failed attempt should be retried.
+        `status` is None when no response was received,
+        and `sent` is False when the request never reached the server.
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if status is None:
+            return idempotent or not sent
+        if status not in self.statuses:
+            return False
+        return idempotent or status == 429
+
+    def delay(self, attempt, retry_after=None):
+        """ (RetryPolicy, int, str) -> float
+
+        Get the seconds to wait after the given attempt.
+        `retry_after` is the raw value of the Retry-After header, if any.
+        """
+        if self.respect_retry_after and retry_after:
+            seconds = parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.max_backoff)
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+def parse_retry_after(value):
+    """ (str) -> float
+
+    Parse a Retry-After header, given either in seconds or as an HTTP date.
+    Returns None if the value cannot be parsed.
+    """
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
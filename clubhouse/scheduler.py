@@ -0,0 +1,212 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+scheduler.py
+
+Run periodic jobs (keep-alive pings, permission checks, refreshes) from one
+thread and a heap of due times, instead of one sleeping thread per job.
+
+Jobs run one at a time on the scheduler thread, so they should not block
+for long: a slow job delays the jobs due after it.
+"""
+
+import time
+import heapq
+import itertools
+import threading
+import traceback
+
+class Job:
+    """
+    Job Class
+
+    Handle of a scheduled job. It behaves like the threading.Event returned
+    by the former thread-per-job helpers: set() cancels the job, and
+    is_set() / wait() tell whether it is finished.
+    """
+
+    def __init__(self, scheduler, interval, func, args, kwargs):
+        self.interval = interval
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.runs = 0
+        self._queued = False
+        self._scheduler = scheduler
+        self._finished = threading.Event()
+
+    def __repr__(self):
+        state = "finished" if self.is_set() else "scheduled"
+        return f"<Job {getattr(self.func, '__name__', self.func)!s} every {self.interval}s, {state}>"
+
+    def set(self):
+        """ (Job) -> NoneType
+
+        Cancel the job. A run in progress is not interrupted.
+        """
+        if not self._finished.is_set():
+            self._finished.set()
+            self._scheduler._cancelled(self)
+
+    cancel = set
+
+    def is_set(self):
+        """ (Job) -> bool
+
+        Check whether the job was cancelled or has stopped.
+        """
+        return self._finished.is_set()
+
+    def wait(self, timeout=None):
+        """ (Job, float) -> bool
+
+        Wait until the job is finished, at most `timeout` seconds.
+        """
+        return self._finished.wait(timeout)
+
+class Scheduler:
+    """
+    Scheduler Class
+
+    >>> scheduler = Scheduler()
+    >>> job = scheduler.every(30, clubhouse.active_ping, channel)
+    >>> ...
+    >>> job.set()
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._shutdown = False
+        self._stale = 0
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap) - self._stale
+
+    def every(self, interval, func, *args, delay=None, **kwargs):
+        """ (Scheduler, float, callable, ..., float, ...) -> Job
+
+        Call func(*args, **kwargs) every `interval` seconds, the first time
+        after `delay` seconds (`interval` by default). The job stops when func
+        returns False or raises.
+        """
+        job = Job(self, interval, func, args, kwargs)
+        self._push(job, time.monotonic() + (interval if delay is None else delay))
+        return job
+
+    def call_later(self, delay, func, *args, **kwargs):
+        """ (Scheduler, float, callable, ...) -> Job
+
+        Call func(*args, **kwargs) once, after `delay` seconds.
+        """
+        job = Job(self, None, func, args, kwargs)
+        self._push(job, time.monotonic() + delay)
+        return job
+
+    def shutdown(self, wait=True):
+        """ (Scheduler, bool) -> NoneType
+
+        Cancel every job and stop the scheduler thread.
+        """
+        with self._cond:
+            self._shutdown = True
+            jobs = [entry[2] for entry in self._heap]
+            self._cond.notify()
+        for job in jobs:
+            job._finished.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _push(self, job, due):
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new jobs after shutdown")
+            heapq.heappush(self._heap, (due, next(self._counter), job))
+            job._queued = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="clubhouse-scheduler")
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+
+    def _cancelled(self, job):
+        with self._cond:
+            if not job._queued:
+                return
+            # Cancelled jobs are dropped when they come due;
+            # rebuild the heap if they make up most of it.
+            self._stale += 1
+            if self._stale > 64 and self._stale * 2 > len(self._heap):
+                for entry in self._heap:
+                    if entry[2].is_set():
+                        entry[2]._queued = False
+                self._heap = [entry for entry in self._heap if entry[2]._queued]
+                heapq.heapify(self._heap)
+                self._stale = 0
+            self._cond.notify()
+
+    def _next(self):
+        """ Wait for the next due job and pop it, or return None on shutdown. """
+        with self._cond:
+            while not self._shutdown:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, job = self._heap[0]
+                if job.is_set():
+                    heapq.heappop(self._heap)
+                    job._queued = False
+                    self._stale -= 1
+                    continue
+                now = time.monotonic()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                heapq.heappop(self._heap)
+                job._queued = False
+                return due, job
+            return None
+
+    def _run(self):
+        while True:
+            entry = self._next()
+            if entry is None:
+                return
+            due, job = entry
+            job.runs += 1
+            try:
+                ret = job.func(*job.args, **job.kwargs)
+            except Exception:
+                traceback.print_exc()
+                ret = False
+            if job.interval is None or ret is False:
+                job._finished.set()
+                continue
+            # Keep the pace of the job, without catching up on missed runs.
+            due = max(due + job.interval, time.monotonic())
+            with self._cond:
+                if self._shutdown:
+                    job._finished.set()
+                    return
+                if job.is_set():
+                    continue
+                heapq.heappush(self._heap, (due, next(self._counter), job))
+                job._queued = True
+
+_DEFAULT = None
+_DEFAULT_LOCK = threading.Lock()
+
+def default_scheduler():
+    """ () -> Scheduler
+
+    Get the scheduler shared by the whole process.
+    """
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = Scheduler()
+        return _DEFAULT
@@ -0,0 +1,100 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+singleflight.py
+
+Coalesce identical requests that are in flight at the same time:
+the first caller sends the request, and every caller that asks for the same
+key before it completes waits for and shares its result (or its exception).
+
+The request runs within the deadline of its first caller. The other callers
+wait at most until their own deadline, and send the request again themselves
+if it failed on the deadline of the first caller.
+"""
+
+import asyncio
+import threading
+from .deadline import remaining as deadline_remaining, DeadlineExceeded
+
+class _Call:
+    """ A request in flight, shared by its callers. """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    SingleFlight Class
+
+    For callers running in threads.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args):
+        """ (SingleFlight, hashable, callable, ...) -> object
+
+        Call func(*args), unless a call for the same key is in flight already.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+            if leader:
+                break
+            if not call.done.wait(deadline_remaining()):
+                raise DeadlineExceeded("Deadline exceeded while waiting for a coalesced call")
+            # The deadline of the first caller is not ours, send the request again.
+            if isinstance(call.error, DeadlineExceeded):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args)
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+class AsyncSingleFlight:
+    """
+    AsyncSingleFlight Class
+
+    For callers running as coroutines of one event loop.
+    The request keeps running if some of its callers are cancelled.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func, *args):
+        """ (AsyncSingleFlight, hashable, coroutine function, ...) -> object
+
+        Await func(*args), unless a call for the same key is in flight already.
+        """
+        while True:
+            task = self._calls.get(key)
+            leader = task is None
+            if leader:
+                task = self._calls[key] = asyncio.ensure_future(func(*args))
+                task.add_done_callback(lambda _: self._calls.pop(key, None))
+            # asyncio.wait neither cancels the task on timeout nor when this caller is cancelled.
+            done, _ = await asyncio.wait([task], timeout=deadline_remaining())
+            if not done:
+                raise DeadlineExceeded("Deadline exceeded while waiting for a coalesced call")
+            # The deadline of the first caller is not ours, send the request again.
+            if not leader and not task.cancelled() and isinstance(task.exception(), DeadlineExceeded):
+                continue
+            return task.result()
@@ -0,0 +1,213 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+watcher.py
+
+Watch many channels at once from a single event loop, instead of running
+one ChannelMonitor thread per channel.
+"""
+
+import time
+import heapq
+import asyncio
+from .monitor import ChannelMonitor, END
+from .ratelimit import TokenBucket
+
+class ChannelWatcher:
+    """
+    ChannelWatcher Class
+
+    Schedules get_channel polls of every watched channel on one heap ordered
+    by due time. Each channel keeps its own adaptive interval (see ChannelMonitor),
+    so busy channels are polled more often than quiet ones. Polls share a
+    budget of `rate` requests per second (bursts of `burst`), and at most
+    `concurrency` of them are in flight at once.
+
+    With `discover`, the channels listed by get_channels are watched too,
+    refreshed every `refresh` seconds, largest channels first.
+    Channels that ended are dropped. Failed polls are retried later with
+    a longer interval, and a channel is only dropped after `max_failures`
+    failed polls in a row.
+
+    Change events of every channel go to one queue, bounded by `maxsize`.
+    The client is preferably an AsyncClubhouse; the calls of a
+    Clubhouse client are run in the default executor.
+
+    >>> async with AsyncClubhouse(user_id, user_token, user_device) as clubhouse:
+    ...     watcher = ChannelWatcher(clubhouse, rate=5, discover=True)
+    ...     task = asyncio.ensure_future(watcher.run())
+    ...     async for event in watcher.events():
+    ...         print(event.channel, event.type, event.user_id)
+    """
+
+    def __init__(self, client, rate=5.0, burst=5, concurrency=10, discover=False, refresh=60.0,
+                 interval=10.0, min_interval=2.0, max_interval=60.0, maxsize=0, max_failures=5):
+        """ (ChannelWatcher, Clubhouse, float, int, int, bool, float, float, float, float, int, int) -> NoneType """
+        self.client = client
+        self.budget = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.discover = discover
+        self.refresh = refresh
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.maxsize = maxsize
+        self.max_failures = max_failures
+        self.errors = 0
+        self.monitors = {}
+        self._heap = []
+        self._due = {}
+        self._seq = 0
+        self._queue = None
+        self._wakeup = None
+        self._stopped = None
+
+    def __len__(self):
+        return len(self.monitors)
+
+    def __contains__(self, channel):
+        return channel in self.monitors
+
+    def _schedule(self, channel, delay):
+        self._seq += 1
+        self._due[channel] = self._seq
+        heapq.heappush(self._heap, (time.monotonic() + delay, self._seq, channel))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def watch(self, channel, delay=0.0):
+        """ (ChannelWatcher, str, float) -> ChannelMonitor
+
+        Start watching the given channel, first polling it after `delay` seconds.
+        """
+        monitor = self.monitors.get(channel)
+        if monitor is None:
+            monitor = self.monitors[channel] = ChannelMonitor(
+                self.client, channel, self.interval, self.min_interval, self.max_interval, self.max_failures
+            )
+            self._schedule(channel, delay)
+        return monitor
+
+    def unwatch(self, channel):
+        """ (ChannelWatcher, str) -> NoneType
+
+        Stop watching the given channel.
+        """
+        self.monitors.pop(channel, None)
+        self._due.pop(channel, None)
+
+    def _init_loop(self):
+        # asyncio primitives are created inside the running event loop
+        if self._stopped is None:
+            self._stopped = asyncio.Event()
+            self._wakeup = asyncio.Event()
+            self._queue = asyncio.Queue(self.maxsize)
+
+    def stop(self):
+        """ (ChannelWatcher) -> NoneType
+
+        Stop run() and events().
+        """
+        self._init_loop()
+        self._stopped.set()
+        self._wakeup.set()
+
+    async def events(self):
+        """ (ChannelWatcher) -> async generator of ChannelEvent
+
+        Yield change events of every watched channel until the watcher is stopped.
+        """
+        self._init_loop()
+        stopper = asyncio.ensure_future(self._stopped.wait())
+        try:
+            while True:
+                getter = asyncio.ensure_future(self._queue.get())
+                await asyncio.wait((getter, stopper), return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    return
+                yield getter.result()
+        finally:
+            stopper.cancel()
+
+    async def _call(self, method, *args):
+        if asyncio.iscoroutinefunction(method):
+            return await method(*args)
+        return await asyncio.get_event_loop().run_in_executor(None, method, *args)
+
+    async def _poll(self, monitor, slots):
+        try:
+            await asyncio.sleep(self.budget.reserve())
+            try:
+                info = await self._call(self.client.get_channel, monitor.channel)
+            except Exception:
+                events = monitor.snapshot.fail()
+            else:
+                events = monitor.snapshot.update(info)
+            if monitor.snapshot.failures:
+                self.errors += 1
+            monitor.adapt(events)
+            for event in events:
+                await self._queue.put(event)
+            if self.monitors.get(monitor.channel) is not monitor:
+                return
+            if events and events[-1].type == END:
+                self.unwatch(monitor.channel)
+            else:
+                self._schedule(monitor.channel, monitor.interval)
+        finally:
+            slots.release()
+
+    async def _discover(self):
+        await asyncio.sleep(self.budget.reserve())
+        try:
+            channels = (await self._call(self.client.get_channels)).get("channels") or []
+        except Exception:
+            self.errors += 1
+            return
+        channels.sort(key=lambda x: x.get("num_all", 0), reverse=True)
+        for channel in channels:
+            self.watch(channel["channel"])
+
+    async def run(self):
+        """ (ChannelWatcher) -> NoneType
+
+        Poll the watched channels until stop() is called.
+        """
+        self._init_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        next_refresh = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                now = time.monotonic()
+                if self.discover and now >= next_refresh:
+                    next_refresh = now + self.refresh
+                    task = asyncio.ensure_future(self._discover())
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                timeout = next_refresh - now if self.discover else None
+                if self._heap:
+                    due, seq, channel = self._heap[0]
+                    if self._due.get(channel) != seq:
+                        # Unwatched or rescheduled since
+                        heapq.heappop(self._heap)
+                        continue
+                    if due <= now:
+                        heapq.heappop(self._heap)
+                        del self._due[channel]
+                        await slots.acquire()
+                        task = asyncio.ensure_future(self._poll(self.monitors[channel], slots))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                        continue
+                    timeout = due - now if timeout is None else min(timeout, due - now)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
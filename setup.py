@@ -34,6 +34,11 @@ setup(
         "clubhouse-lib",
     ],
     install_requires=_requires_from_file("requirements.txt"),
+    extras_require={
+        "async": ["aiohttp"],
+        "fast": ["orjson"],
+        "export": ["pyarrow"],
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",